@@ -4,12 +4,13 @@ Lets SQLAlchemy manage connections internally with built-in pooling.
 Use this for internal/small queries, while keeping raw SQL for high-traffic customer APIs.
 """
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, TextClause
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from typing import Generator, Any, Dict, List
 from contextlib import contextmanager
+from functools import lru_cache
 
 
 # Logger
@@ -34,6 +35,13 @@ Base = declarative_base()
 
 # Create engines with built-in connection pooling
 # SQLAlchemy handles all connection management internally
+#
+# Prepared statements: psycopg 3 prepares a statement server-side once it has run
+# DATABASE_PREPARE_THRESHOLD times on a connection and keeps it for the connection's lifetime,
+# so the fixed create_order / status update statements are planned once per pooled connection.
+# The cache stays warm because pooled connections are reused; pool_recycle drops it hourly.
+# Set the threshold to 0 to prepare on first use; set it empty to disable preparing behind a
+# transaction-pooling PgBouncer, which cannot route prepared statements.
 engine = create_engine(
     DATABASE_URL,
     poolclass=QueuePool,
@@ -45,7 +53,8 @@ engine = create_engine(
     connect_args={
         "keepalives_idle": 600,
         "keepalives_interval": 30,
-        "keepalives_count": 3
+        "keepalives_count": 3,
+        "prepare_threshold": configs.DATABASE_PREPARE_THRESHOLD
     }
 )
 
@@ -61,7 +70,8 @@ read_engine = create_engine(
     connect_args={
         "keepalives_idle": 600,
         "keepalives_interval": 30,
-        "keepalives_count": 3
+        "keepalives_count": 3,
+        "prepare_threshold": configs.DATABASE_PREPARE_THRESHOLD
     }
 ) if DATABASE_READ_URL != DATABASE_URL else engine
 
@@ -111,6 +121,12 @@ class DatabaseSession:
 
 logger.info("SQLAlchemy engines initialized with built-in connection pooling")
 
+@lru_cache(maxsize=256)
+def _text_clause(query: str) -> TextClause:
+    """text() for a SQL string, parsed once; repository queries are a small fixed set of strings."""
+    return text(query)
+
+
 # Simplified raw SQL execution using SessionLocal
 def execute_raw_sql(query: str, params: Dict[str, Any] = None, fetch_results: bool = True) -> List[Dict[str, Any]]:
     """
@@ -127,7 +143,7 @@ def execute_raw_sql(query: str, params: Dict[str, Any] = None, fetch_results: bo
     """
     db = SessionLocal()
     try:
-        result = db.execute(text(query), params or {})
+        result = db.execute(_text_clause(query), params or {})
         if fetch_results:
             # Convert result to list of dictionaries
             columns = result.keys()
@@ -154,7 +170,7 @@ def execute_raw_sql_readonly(query: str, params: Dict[str, Any] = None) -> List[
     """
     db = ReadSessionLocal()
     try:
-        result = db.execute(text(query), params or {})
+        result = db.execute(_text_clause(query), params or {})
         columns = result.keys()
         return [dict(zip(columns, row)) for row in result.fetchall()]
     finally:
@@ -1,6 +1,7 @@
 import json
 import redis
 import os
+from typing import Optional
 from urllib.parse import quote_plus
 
 # Logger
@@ -104,6 +105,24 @@ class RedisJSONWrapper:
     def delete(self, key):
         return self.redis_client.delete(key) > 0
 
+    def delete_many(self, keys):
+        """Delete several keys in one command; returns how many existed."""
+        keys = list(keys)
+        return self.redis_client.delete(*keys) if keys else 0
+
+    def hget(self, key, field):
+        data = self.redis_client.hget(key, field)
+        if data:
+            return json.loads(data)
+        return None
+
+    def hset_with_ttl(self, key, field, data, ttl_seconds: int):
+        """Set one field of a hash and re-arm the expiry of the whole hash in one round trip."""
+        pipe = self.redis_client.pipeline()
+        pipe.hset(key, field, json.dumps(data))
+        pipe.expire(key, ttl_seconds)
+        pipe.execute()
+
     def keys(self, pattern='*'):
         return [key.decode('utf-8') for key in self.redis_client.keys(pattern)]
 
@@ -114,3 +133,15 @@ class RedisJSONWrapper:
             self.delete(key)
             print(f"Deleted key: {key}")
         return len(matching_keys)
+
+
+# Cache-DB connection shared by callers that only need short-lived keys
+_cache_client: Optional[RedisJSONWrapper] = None
+
+
+def get_cache_client() -> Optional[RedisJSONWrapper]:
+    """Shared RedisJSONWrapper on REDIS_CACHE_DB, reconnected on the next call while Redis is unreachable; None while it is down."""
+    global _cache_client
+    if _cache_client is None or not _cache_client.connected:
+        _cache_client = RedisJSONWrapper(database=configs.REDIS_CACHE_DB)
+    return _cache_client if _cache_client.connected else None
@@ -75,41 +75,42 @@ class OrderStatus:
         "delivered": TMS_DELIVERED,
     }
 
+    # Customer-friendly status names; internal WMS/TMS statuses are shown as the Rozana step they belong to
+    CUSTOMER_STATUS_MAP = {
+        DRAFT: "Payment Pending",
+        OPEN: "Processing",
+        FULFILLED: "Delivered", 
+        PARTIALLY_FULFILLED: "Delivered",
+        UNFULFILLED: "Delivery Failed",
+        CANCELED: "Cancelled",
+        RETURN: "Return Initiated",
+        RETURNED: "Returned",
+        CANCELLED_PENDING_REFUND: "Cancelled",
+        POTIONS_SYNCED: "Confirmed",
+        POTIONS_SYNC_FAILED: "Processing",
+        WMS_SYNCED: "Confirmed",
+        WMS_SYNC_FAILED: "Processing",
+        WMS_OPEN: "Confirmed",
+        WMS_CANCELED: "Cancelled",
+        WMS_INPROGRESS: "Packing Your Order",
+        WMS_PICKED: "Packing Your Order",
+        WMS_FULFILLED: "Packed",
+        WMS_INVOICED: "Ready For Dispatch",
+        TMS_SYNCED: "Finding Rider",
+        TMS_SYNC_FAILED: "Ready For Dispatch",
+        RIDER_ASSIGNED: "Rider Assigned",
+        TMS_OUT_FOR_DELIVERY: "Out For Delivery",
+        TMS_DELIVERED: "Delivered",
+        TMS_RETURNED: "Delivery Failed",
+        TMS_CANCELLED: "Delivery Cancelled",
+        TMS_RTO_REVOKE: "Delivery Cancelled",
+        TMS_PARTIAL_DELIVERED: "Delivered"
+    }
+
     @classmethod
     def get_customer_status_name(cls, status_code: int) -> str:
         """Get customer-friendly status name from status code (only Rozana statuses)"""
-        # Only show customer-relevant statuses, hide internal WMS/TMS statuses
-        customer_status_map = {
-            cls.DRAFT: "Payment Pending",
-            cls.OPEN: "Processing",
-            cls.FULFILLED: "Delivered", 
-            cls.PARTIALLY_FULFILLED: "Delivered",
-            cls.UNFULFILLED: "Delivery Failed",
-            cls.CANCELED: "Cancelled",
-            cls.RETURN: "Return Initiated",
-            cls.RETURNED: "Returned",
-            cls.CANCELLED_PENDING_REFUND: "Cancelled",
-            cls.POTIONS_SYNCED: "Confirmed",
-            cls.POTIONS_SYNC_FAILED: "Processing",
-            cls.WMS_SYNCED: "Confirmed",
-            cls.WMS_SYNC_FAILED: "Processing",
-            cls.WMS_OPEN: "Confirmed",
-            cls.WMS_CANCELED: "Cancelled",
-            cls.WMS_INPROGRESS: "Packing Your Order",
-            cls.WMS_PICKED: "Packing Your Order",
-            cls.WMS_FULFILLED: "Packed",
-            cls.WMS_INVOICED: "Ready For Dispatch",
-            cls.TMS_SYNCED: "Finding Rider",
-            cls.TMS_SYNC_FAILED: "Ready For Dispatch",
-            cls.RIDER_ASSIGNED: "Rider Assigned",
-            cls.TMS_OUT_FOR_DELIVERY: "Out For Delivery",
-            cls.TMS_DELIVERED: "Delivered",
-            cls.TMS_RETURNED: "Delivery Failed",
-            cls.TMS_CANCELLED: "Delivery Cancelled",
-            cls.TMS_RTO_REVOKE: "Delivery Cancelled",
-            cls.TMS_PARTIAL_DELIVERED: "Delivered"
-        }
-        return customer_status_map.get(status_code, "Processing")
+        return cls.CUSTOMER_STATUS_MAP.get(status_code, "Processing")
     
     
     @classmethod
@@ -191,6 +192,23 @@ class PaymentStatus:
         return status_code in [cls.COMPLETED, cls.FAILED, cls.REFUNDED]
 
 
+class PaymentGatewayConstants:
+    """Payment gateway webhook constants"""
+
+    # Gateway payment status -> internal payment status; anything else is not processed
+    RAZORPAY_TO_PAYMENT_STATUS = {
+        "captured": PaymentStatus.COMPLETED,
+        "failed": PaymentStatus.FAILED,
+    }
+    CASHFREE_TO_PAYMENT_STATUS = {
+        "SUCCESS": PaymentStatus.COMPLETED,
+        "FAILED": PaymentStatus.FAILED,
+    }
+
+    # Only orders in DRAFT or OPEN status take payment events
+    PROCESSABLE_ORDER_STATUSES = frozenset((OrderStatus.DRAFT, OrderStatus.OPEN))
+
+
 class SystemConstants:
     """System-wide constants"""
     
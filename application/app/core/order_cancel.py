@@ -7,6 +7,7 @@ from app.core.constants import OrderStatus, CancelReasons
 from sqlalchemy import text
 
 from app.utils.order_utils import can_cancel_order
+from app.utils.order_list_cache import invalidate_order_list
 
 # Logger
 from app.logging.utils import get_app_logger
@@ -26,7 +27,7 @@ async def cancel_order_core(order_id: str, cancel_reason: str = None, cancel_rem
     try:
         with get_raw_transaction() as conn:
             check_order_sql = """
-                SELECT id, order_id, status, facility_name, marketplace
+                SELECT id, order_id, customer_id, status, facility_name, marketplace
                 FROM orders 
                 WHERE order_id = :order_id
             """
@@ -93,6 +94,7 @@ async def cancel_order_core(order_id: str, cancel_reason: str = None, cancel_rem
 
             conn.commit()
             logger.info(f"Order {order_id} status updated to CANCELED in database")
+            invalidate_order_list(order_row.customer_id)
         
         try:
             potions_service = PotionsService()
@@ -1,6 +1,7 @@
 from fastapi import Request, HTTPException, BackgroundTasks
 from datetime import datetime
 from collections import defaultdict
+import asyncio
 import json
 from decimal import Decimal
 
@@ -389,7 +390,7 @@ async def get_all_orders_core(
     user_id: str, page_size: int, page: int, 
     sort_order: str, search: str = None, 
     exclude_status: str = None,
-    current_order_limit: str = None, ph_number: str = None, user_type: str = None):
+    current_order_limit: str = None, ph_number: str = None, user_type: str = None, cursor: str = None):
     """Shared logic for listing all orders for the authenticated user with optional search functionality."""
     try:
         service = OrderQueryService()
@@ -405,7 +406,8 @@ async def get_all_orders_core(
             exclude_statuses.append(int(exclude_status))
             exclude_statuses.append(OrderStatus.DRAFT)
 
-        result = service.get_all_orders(user_id, page_size, page, sort_order, search, exclude_statuses, current_order_limit, ph_number, user_type)
+        # The query service is synchronous; keep its database waits off the event loop
+        result = await asyncio.to_thread(service.get_all_orders, user_id, page_size, page, sort_order, search, exclude_statuses, current_order_limit, ph_number, user_type, cursor)
         return result
     except HTTPException:
         raise
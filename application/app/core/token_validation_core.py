@@ -15,7 +15,7 @@ from app.logging.utils import get_app_logger
 logger = get_app_logger(__name__)
 
 
-async def validate_token_and_get_orders(token: str, customer_id: str, page_size: int = 20, page: int = 1, sort_order: str = "desc", search: str = None):
+async def validate_token_and_get_orders(token: str, customer_id: str, page_size: int = 20, page: int = 1, sort_order: str = "desc", search: str = None, cursor: str = None):
     token_service = TokenValidationService()
     is_valid = await token_service.validate_token(token)
     
@@ -24,7 +24,7 @@ async def validate_token_and_get_orders(token: str, customer_id: str, page_size:
     
     try:
         service = OrderQueryService()
-        result = service.get_orders_by_customer_id(customer_id, page_size, page, sort_order, search)
+        result = service.get_orders_by_customer_id(customer_id, page_size, page, sort_order, search, cursor)
         
         return result
     except HTTPException:
@@ -45,7 +45,7 @@ async def validate_token_and_get_order_items(token: str, customer_id: str, order
         
         logger.info(f"Looking up order_id: {order_id} for customer: {customer_id}")
         order = service.get_order_by_id(order_id)
-        logger.info(f"Order lookup result: {order}")
+        logger.info(f"Order lookup result: found={order is not None}")
         
         if not order:
             logger.warning(f"Order {order_id} not found in database")
@@ -144,11 +144,11 @@ async def validate_token_and_return_full_order(token: str, customer_id: str, ord
         logger.error("Error returning full order %s for customer %s: %s", order_id, customer_id, exc)
         raise HTTPException(status_code=500, detail="Internal server error") from exc
 
-async def get_orders_by_phone_number(phone_number: str, page_size: int = 20, page: int = 1, sort_order: str = "desc", search: str = None):
+async def get_orders_by_phone_number(phone_number: str, page_size: int = 20, page: int = 1, sort_order: str = "desc", search: str = None, cursor: str = None):
     try:
         customer_id = await get_customer_id_from_phone_number(phone_number)
         service = OrderQueryService()
-        result = service.get_orders_by_customer_id(customer_id, page_size, page, sort_order, search)
+        result = service.get_orders_by_customer_id(customer_id, page_size, page, sort_order, search, cursor)
         
         return result
     except HTTPException:
@@ -12,6 +12,9 @@ class OrderReturnItemRequest(BaseModel):
     line_reference: Optional[int] = Field(None, description="Reference ID to identify if this was a freebie item")
 
 
+# Fields forwarded to create_return_core for each requested item
+RETURN_ITEM_FIELDS = frozenset({"sku", "quantity", "line_reference"})
+
 
 class CreateReturnRequest(BaseModel):
     order_id: str = Field(..., min_length=1, max_length=50, description="Order ID for return")
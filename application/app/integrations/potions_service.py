@@ -1,6 +1,7 @@
+import asyncio
 import httpx
 from httpx_retry import AsyncRetryTransport, RetryPolicy
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from app.core.constants import OrderStatus
 
@@ -21,6 +22,37 @@ from app.repository.orders import OrdersRepository
 order_repository = OrdersRepository()
 configs = OMSConfigs()
 
+# Max concurrent order sync calls made by sync_orders_by_ids
+POTIONS_SYNC_CONCURRENCY = 8
+
+# HTTP client shared by all PotionsService instances so connections (and TLS sessions) are reused
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_shared_client(timeout) -> httpx.AsyncClient:
+    """Return the process-wide Potions HTTP client, creating it on first use."""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        # Configure retry policy for Potions API calls
+        retry_policy = RetryPolicy(
+            max_retries=5,
+            initial_delay=0.5,
+            multiplier=2.0,
+            retry_on=[429, 500, 502, 503, 504]
+        )
+        # Create retry transport
+        retry_transport = AsyncRetryTransport(policy=retry_policy)
+        _shared_client = httpx.AsyncClient(transport=retry_transport, timeout=timeout)
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    """Close the process-wide Potions HTTP client; call once at application shutdown."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
 class PotionsServiceReturnMessage(BaseModel):
     success: bool
     message: str
@@ -47,22 +79,8 @@ class PotionsService:
             logger.error("Potions integration is disabled or not configured")
             raise ValueError("Potions integration is disabled or not configured")
 
-        # Configure retry policy for Potions API calls
-        retry_policy = RetryPolicy(
-            max_retries=5,
-            initial_delay=0.5,
-            multiplier=2.0,
-            retry_on=[429, 500, 502, 503, 504]
-        )
-        # Create retry transport
-        retry_transport = AsyncRetryTransport(policy=retry_policy)
-
-        # Persistent async client with retry support
-        self.client = httpx.AsyncClient(transport=retry_transport, timeout=self.timeout)
-
-    async def close(self):
-        """Explicitly close the HTTP client to free resources."""
-        await self.client.aclose()
+        # Persistent async client with retry support, shared across instances
+        self.client = _get_shared_client(self.timeout)
 
     def return_message(self, success: bool, message: str, task_id: Optional[str] = None, data: Optional[Dict[str, Any]] = None) -> PotionsServiceReturnMessage:
         return PotionsServiceReturnMessage(success=success, message=message, task_id=task_id, data=data)
@@ -196,6 +214,21 @@ class PotionsService:
                 logger.error(f"potions_sync_exception | order_id={order_id} facility_name={facility_name} error={e}", exc_info=True)
             return self.return_message(success=False, message="Exception occurred while syncing to Potions WMS", task_id=None)
 
+    async def sync_orders_by_ids(self, facility_name: str, order_ids: List[str], order_service) -> Dict[str, PotionsServiceReturnMessage]:
+        """Sync several orders of one facility to Potions WMS concurrently over the shared client.
+
+        Potions accepts one order per create call, so each order is still its own request;
+        results are keyed by order ID.
+        """
+        semaphore = asyncio.Semaphore(POTIONS_SYNC_CONCURRENCY)
+
+        async def sync(order_id: str) -> PotionsServiceReturnMessage:
+            async with semaphore:
+                return await self.sync_order_by_id(facility_name, order_id, order_service)
+
+        results = await asyncio.gather(*(sync(order_id) for order_id in order_ids))
+        return dict(zip(order_ids, results))
+
     async def _trigger_potions_sync(self, order_id: str) -> PotionsServiceReturnMessage:
         """Trigger Potions WMS sync via API call with automatic retry support."""
         try:
@@ -9,7 +9,7 @@ import razorpay
 import hashlib
 import hmac
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from decimal import Decimal
 from datetime import datetime, timezone
 from app.models.common import get_ist_now
@@ -30,6 +30,7 @@ class RazorpayService:
         self.key_id = configs.RAZORPAY_KEY_ID
         self.key_secret = configs.RAZORPAY_KEY_SECRET
         self.webhook_secret = configs.RAZORPAY_WEBHOOK_SECRET
+        self.webhook_secret_bytes = self.webhook_secret.encode()
         self.integration_enabled = configs.RAZORPAY_INTEGRATION_ENABLED
         self.base_url = configs.RAZORPAY_BASE_URL
         self.currency = configs.RAZORPAY_CURRENCY
@@ -162,11 +163,11 @@ class RazorpayService:
             logger.error(f"razorpay_signature_verify_error | razorpay_order_id={razorpay_order_id} razorpay_payment_id={razorpay_payment_id} error={e}", exc_info=True)
             return False
 
-    async def verify_webhook_signature(self, payload: str, signature: str) -> bool:
+    async def verify_webhook_signature(self, payload: Union[bytes, str], signature: str) -> bool:
         """
         Verify webhook signature from Razorpay
         Args:
-            payload: Webhook payload
+            payload: Webhook payload (raw request body bytes, or its decoded text)
             signature: Webhook signature
         Returns:
             True if signature is valid, False otherwise
@@ -175,7 +176,8 @@ class RazorpayService:
             logger.warning("razorpay_webhook_verify_skipped")
             return False
         try:
-            expected_signature = hmac.new(self.webhook_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+            payload_bytes = payload if isinstance(payload, bytes) else payload.encode()
+            expected_signature = hmac.digest(self.webhook_secret_bytes, payload_bytes, 'sha256').hex()
             return hmac.compare_digest(expected_signature, signature)
         except Exception as e:
             logger.error(f"razorpay_webhook_verify_error | error={e}", exc_info=True)
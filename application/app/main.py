@@ -39,9 +39,14 @@ firebase_admin.initialize_app(cred_pos, name="pos")
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    from app.services.order_meta_service import start_order_meta_flusher, stop_order_meta_flusher
+    from app.integrations.potions_service import close_shared_client as close_potions_client
     logger.info("Starting Rozana OMS")
+    start_order_meta_flusher()
     yield
     logger.info("Shutting down Rozana OMS")
+    await stop_order_meta_flusher()
+    await close_potions_client()
     # OpenTelemetry removed
     close_db_pool()
 
@@ -103,7 +108,6 @@ register_exception_handlers(app)
 from app.routes.app import app_router
 # from app.routes.web import web_router
 from app.routes.pos import pos_router
-from app.routes.pos.facility_terminals import facility_terminal_router
 from app.routes.health import router as health_router
 from app.routes.app.payments import payment_router
 from app.routes.webhooks.razorpay_status import webhook_router
@@ -115,7 +119,6 @@ from app.routes.auth_otp import router as auth_otp_router
 app.include_router(app_router, prefix="/app/v1")
 app.include_router(payment_router, prefix="/app/v1")
 app.include_router(pos_router, prefix="/pos/v1")
-app.include_router(facility_terminal_router, prefix="/pos/v1")
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(auth_otp_router, prefix="/auth")
 app.include_router(health_router, tags=["health"])
@@ -34,6 +34,11 @@ class _RequestContextProxy:
 request_context = _RequestContextProxy()
 
 
+def get_request_context() -> RequestContext:
+    """Return the current context object; cheaper than several proxy attribute reads."""
+    return _request_context_var.get()
+
+
 def set_request_context(ctx: RequestContext):
     _request_context_var.set(ctx)
 
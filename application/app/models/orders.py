@@ -60,6 +60,8 @@ class Order(CommonModel):
         Index('idx_orders_customer_status', 'customer_id', 'status'),
         Index('idx_orders_facility_status', 'facility_id', 'status'),
         Index('idx_orders_status_created', 'status', 'created_at'),
+        Index('idx_orders_customer_created', 'customer_id', 'created_at'),
+        Index('idx_orders_facility_name_created', 'facility_name', 'created_at'),
     )
 
 
@@ -2,7 +2,7 @@
 Order Meta Repository for raw SQL operations
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from sqlalchemy import text
 from app.connections.database import get_raw_transaction
 from app.logging.utils import get_app_logger
@@ -13,14 +13,31 @@ logger = get_app_logger("app.order_meta_repository")
 class OrderMetaRepository:
     """Repository for order metadata database operations using raw SQL"""
 
+    @staticmethod
+    def order_meta_params(order_id: int, client_ip: Optional[str] = None, user_agent: Optional[str] = None, device: Optional[str] = None,
+                          platform: Optional[str] = None, app_version: Optional[str] = None, web_version: Optional[str] = None,
+                          longitude: Optional[float] = None, latitude: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Build the column-ready bind parameters of one order_metadata row.
+        """
+        return {
+            "order_id": order_id,
+            "client_ip": client_ip,
+            "user_agent": user_agent,
+            "device": device,
+            "platform": platform,
+            # Stores web_version if present, otherwise app_version in the version column.
+            "version": web_version or app_version or None,
+            "longitude": longitude or 0.00,
+            "latitude": latitude or 0.00,
+        }
+
     def create_order_meta(self, order_id: int, client_ip: Optional[str] = None, user_agent: Optional[str] = None, device: Optional[str] = None,
                         platform: Optional[str] = None, app_version: Optional[str] = None, web_version: Optional[str] = None,
                         longitude: Optional[float] = None, latitude: Optional[float] = None) -> None:
         """
         Create an order metadata record using raw SQL.
         """
-        # Stores web_version if present, otherwise app_version in the version column.
-        version = web_version or app_version or None
         insert_query = text("""
             INSERT INTO order_metadata (
                 order_id, client_ip, user_agent, device, platform, version,
@@ -33,16 +50,8 @@ class OrderMetaRepository:
         """)
 
         try:
-            params = {
-                "order_id": order_id,
-                "client_ip": client_ip,
-                "user_agent": user_agent,
-                "device": device,
-                "platform": platform,
-                "version": version,
-                "longitude": longitude or 0.00,
-                "latitude": latitude or 0.00,
-            }
+            params = self.order_meta_params(order_id, client_ip, user_agent, device, platform, app_version, web_version, longitude, latitude)
+            version = params["version"]
             with get_raw_transaction() as conn:
                 result = conn.execute(insert_query, params)
 
@@ -57,4 +66,33 @@ class OrderMetaRepository:
 
         except Exception as e:
             logger.error(f"order_meta_create_error | order_id={order_id} client_ip={client_ip} error={e}")
-            raise e
\ No newline at end of file
+            raise e
+
+    def bulk_create_order_meta(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Create several order metadata records in one transaction (executemany).
+        Each row is a dict built by order_meta_params.
+        """
+        if not rows:
+            return
+        insert_query = text("""
+            INSERT INTO order_metadata (
+                order_id, client_ip, user_agent, device, platform, version,
+                longitude, latitude, created_at, updated_at
+            ) VALUES (
+                :order_id, :client_ip, :user_agent, :device, :platform, :version,
+                :longitude, :latitude, NOW(), NOW()
+            )
+        """)
+
+        try:
+            params = list(rows)
+            with get_raw_transaction() as conn:
+                conn.execute(insert_query, params)
+
+            logger.info(f"order_meta_bulk_created | count={len(params)}")
+            logger.debug(f"order_meta_bulk_created_ids | order_ids={[p['order_id'] for p in params]}")
+
+        except Exception as e:
+            logger.error(f"order_meta_bulk_create_error | count={len(rows)} order_ids={[r['order_id'] for r in rows]} error={e}")
+            raise e
@@ -1,10 +1,14 @@
 from typing import Dict, List, Tuple, Optional, Union
 from app.connections.database import execute_raw_sql_readonly, execute_raw_sql
 from app.connections.mariadb_connection import mariadb_connection
+from app.utils.order_list_cache import invalidate_order_list
 from app.logging.utils import get_app_logger
 
 logger = get_app_logger("app.orders_repository")
 
+# Upper bound on ids per MariaDB IN (...) list; larger inputs are split into several queries
+LEGACY_IN_CLAUSE_CHUNK_SIZE = 30000
+
 
 class OrdersRepository:
     def get_oms_orders_count(self, user_id: str, clause: Tuple = None, params: Tuple = None) -> int:
@@ -28,7 +32,8 @@ class OrdersRepository:
             logger.error(f"oms_orders_count_error | user_id={user_id} error={e}", exc_info=True)
             raise
 
-    def get_oms_orders(self, user_id: str, page_size: int, page: int, clause: Tuple = None, params: Tuple = None) -> List[Dict]:
+    def get_oms_orders(self, user_id: str, page_size: int, page: int, clause: Tuple = None, params: Tuple = None, cursor: Optional[Tuple] = None) -> List[Dict]:
+        """Page of a customer's orders; with a (created_at, id) cursor the page starts after it instead of at an OFFSET."""
         try:
             search_clause, exclude_clause, user_type_clause, order_clause = clause
             search_params, exclude_params, user_type_params = params
@@ -37,7 +42,17 @@ class OrdersRepository:
                        o.facility_id, o.facility_name,
                        o.status, o.total_amount, o.eta,
                        o.created_at, o.updated_at,
-                       oa.longitude, oa.latitude, o.order_mode, o.promotion_discount, o.promotion_type, o.user_type
+                       oa.longitude, oa.latitude, o.order_mode, o.promotion_discount, o.promotion_type, o.user_type,
+                       (
+                           SELECT COALESCE(json_agg(json_build_object(
+                                      'child_sku', oi.sku,
+                                      'thumbnail_url', oi.thumbnail_url,
+                                      'quantity', COALESCE(trunc(oi.quantity), 0)::int,
+                                      'name', COALESCE(oi.name, '')
+                                  ) ORDER BY oi.id), '[]'::json)
+                           FROM order_items oi
+                           WHERE oi.order_id = o.id
+                       ) AS history_items
                 FROM orders o
                 LEFT JOIN LATERAL (
                     SELECT oa.longitude, oa.latitude
@@ -53,47 +68,27 @@ class OrdersRepository:
                 query += exclude_clause
             if user_type_clause:
                 query += user_type_clause
-            query += " " + order_clause + " LIMIT :limit OFFSET :offset"
             sql_params = {
                 'user_id': user_id,
                 'limit': page_size,
-                'offset': (page - 1) * page_size,
                 **search_params,
                 **exclude_params,
                 **user_type_params,
             }
+            if cursor:
+                # Keyset page: continue after the cursor row in the order_clause direction
+                comparison = "<" if "DESC" in order_clause else ">"
+                query += f" AND (o.created_at, o.id) {comparison} (:cursor_created_at, :cursor_id)"
+                query += " " + order_clause + " LIMIT :limit"
+                sql_params['cursor_created_at'], sql_params['cursor_id'] = cursor
+            else:
+                query += " " + order_clause + " LIMIT :limit OFFSET :offset"
+                sql_params['offset'] = (page - 1) * page_size
             return execute_raw_sql_readonly(query, sql_params)
         except Exception as e:
             logger.error(f"oms_orders_fetch_error | user_id={user_id} page={page} size={page_size} error={e}", exc_info=True)
             raise
 
-    def get_oms_order_items_by_order_ids(self, order_ids: List[str]) -> Dict:
-        try:
-            if not order_ids:
-                return {}
-            query = """
-                SELECT oi.order_id, oi.sku, oi.thumbnail_url, oi.quantity, oi.name
-                FROM order_items oi
-                WHERE oi.order_id = ANY(:order_ids)
-                ORDER BY oi.order_id, oi.id
-            """
-            rows = execute_raw_sql_readonly(query, {'order_ids': order_ids})
-            items_by_order: Dict = {}
-            for item_row in rows:
-                oid = item_row.get("order_id")
-                if oid not in items_by_order:
-                    items_by_order[oid] = []
-                items_by_order[oid].append({
-                    "child_sku": item_row.get("sku"),
-                    "thumbnail_url": item_row.get("thumbnail_url"),
-                    "quantity": int(item_row.get("quantity", 0)) if item_row.get("quantity") is not None else 0,
-                    "name": item_row.get("name") or "",
-                })
-            return items_by_order
-        except Exception as e:
-            logger.error(f"oms_order_items_fetch_error | order_ids_count={len(order_ids) if order_ids else 0} error={e}", exc_info=True)
-            raise
-
     def count_legacy_orders(self, user_id: int) -> int:
         try:
             query = """
@@ -327,33 +322,35 @@ class OrdersRepository:
                     )
             if not numeric_ids:
                 return {}
-            placeholders = ",".join(["%s"] * len(numeric_ids))
-            query = f"""
-                SELECT od.order_id, fp.child_sku, fp.thumbnail_image, od.quantity, od.variant_name
-                FROM order_details od
-                LEFT JOIN orders o ON o.id = od.order_id
-                LEFT JOIN final_products fp ON fp.product_id = od.product_id AND fp.sorting_hub_id = o.sorting_hub_id
-                WHERE od.order_id IN ({placeholders})
-                ORDER BY od.order_id, od.id
-            """
+            items_by_order: Dict[str, List[Dict]] = {}
             with mariadb_connection.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(query, numeric_ids)
-                    rows = cursor.fetchall() or []
-                    items_by_order: Dict[str, List[Dict]] = {}
-                    for r in rows:
-                        oid = str(r[0]) if r[0] is not None else None
-                        if oid is None:
-                            continue
-                        if oid not in items_by_order:
-                            items_by_order[oid] = []
-                        items_by_order[oid].append({
-                            "child_sku": r[1],
-                            "thumbnail_url": r[2],
-                            "quantity": int(r[3]) if r[3] is not None else 0,
-                            "name": r[4] or "",
-                        })
-                    logger.info(f"legacy_order_items={items_by_order}")
+                    for start in range(0, len(numeric_ids), LEGACY_IN_CLAUSE_CHUNK_SIZE):
+                        chunk = numeric_ids[start:start + LEGACY_IN_CLAUSE_CHUNK_SIZE]
+                        placeholders = ",".join(["%s"] * len(chunk))
+                        query = f"""
+                            SELECT od.order_id, fp.child_sku, fp.thumbnail_image, od.quantity, od.variant_name
+                            FROM order_details od
+                            LEFT JOIN orders o ON o.id = od.order_id
+                            LEFT JOIN final_products fp ON fp.product_id = od.product_id AND fp.sorting_hub_id = o.sorting_hub_id
+                            WHERE od.order_id IN ({placeholders})
+                            ORDER BY od.order_id, od.id
+                        """
+                        cursor.execute(query, chunk)
+                        rows = cursor.fetchall() or []
+                        for r in rows:
+                            oid = str(r[0]) if r[0] is not None else None
+                            if oid is None:
+                                continue
+                            if oid not in items_by_order:
+                                items_by_order[oid] = []
+                            items_by_order[oid].append({
+                                "child_sku": r[1],
+                                "thumbnail_url": r[2],
+                                "quantity": int(r[3]) if r[3] is not None else 0,
+                                "name": r[4] or "",
+                            })
+                    logger.info(f"legacy_order_items_fetched | order_ids_count={len(numeric_ids)} orders_with_items={len(items_by_order)}")
                     return items_by_order
         except Exception as e:
             logger.error(f"legacy_order_items_fetch_error | order_ids_count={len(order_ids) if order_ids else 0} error={e}", exc_info=True)
@@ -403,9 +400,11 @@ class OrdersRepository:
         query = """ UPDATE orders SET status = :status WHERE order_id = :order_id """
         execute_raw_sql(query, {'status': status, 'order_id': order_id}, fetch_results=False)
 
-        query = """ SELECT id FROM orders WHERE order_id = :order_id """
+        query = """ SELECT id, customer_id FROM orders WHERE order_id = :order_id """
         result = execute_raw_sql(query, {'order_id': order_id})
         order_pk = result[0].get('id') if result else None
 
         query = """ UPDATE order_items SET status = :status WHERE order_id = :order_pk """
         execute_raw_sql(query, {'status': status, 'order_pk': order_pk}, fetch_results=False)
+        if result:
+            invalidate_order_list(result[0].get('customer_id'))
@@ -5,7 +5,7 @@ Payment repository for raw SQL operations
 from app.connections.database import get_raw_transaction, execute_raw_sql, execute_raw_sql_readonly
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from sqlalchemy import text
 from app.core.constants import PaymentStatus
 
@@ -124,6 +124,35 @@ class PaymentRepository:
             logger.error(f"order_payments_fetch_error | order_id={order_id} error={e}", exc_info=True)
             raise e
 
+    def get_payments_for_orders(self, order_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get payment records for several orders in one query, grouped by order_id.
+        Each record has the same shape as get_payments_for_order; orders without
+        payments are absent from the result.
+        """
+        if not order_ids:
+            return {}
+        try:
+            # The id list is bound as a single array parameter, so no chunking is needed
+            query = """
+                SELECT pd.id, pd.order_id, pd.payment_order_id, pd.payment_id, pd.payment_amount,
+                       pd.payment_date, pd.payment_mode, pd.payment_status, pd.total_amount,
+                       pd.terminal_id, pd.remarks, pd.created_at, pd.updated_at, orders.customer_id, orders.facility_name,
+                       orders.order_id AS order_reference_id
+                FROM payment_details as pd
+                JOIN orders ON pd.order_id = orders.id
+                WHERE orders.order_id = ANY(:order_ids)
+                ORDER BY pd.created_at DESC
+            """
+            rows = execute_raw_sql(query, {"order_ids": list(order_ids)})
+            payments_by_order: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                payments_by_order.setdefault(row.pop("order_reference_id"), []).append(row)
+            return payments_by_order
+        except Exception as e:
+            logger.error(f"orders_payments_fetch_error | order_ids={order_ids} error={e}", exc_info=True)
+            raise e
+
     def upadate_the_razorpay_payment_id(self, id: int, razorpay_payment_id: str) -> Dict[str, Any]:
         """
         Update the razorpay_payment_id for a payment record
@@ -140,6 +169,36 @@ class PaymentRepository:
             logger.error(f"payment_record_update_error | payment_id={razorpay_payment_id} error={e}", exc_info=True)
             raise e
 
+    def update_gateway_payments(self, record_ids: List[int], gateway_payment_id: str, payment_status: int) -> List[int]:
+        """
+        Attach a gateway payment id and status to several payment records in one statement.
+        Returns the ids of the records that were updated.
+        """
+        if not record_ids:
+            return []
+        try:
+            query = text("""
+                UPDATE payment_details
+                SET payment_id = :payment_id,
+                    payment_status = :payment_status,
+                    updated_at = :updated_at
+                WHERE id = ANY(:record_ids)
+                RETURNING id
+            """)
+            with get_raw_transaction() as conn:
+                result = conn.execute(query, {
+                    "payment_id": gateway_payment_id,
+                    "payment_status": payment_status,
+                    "updated_at": datetime.now(timezone.utc),
+                    "record_ids": list(record_ids),
+                })
+                updated_ids = [row[0] for row in result.fetchall()]
+            logger.info(f"gateway_payments_updated | payment_id={gateway_payment_id} status={payment_status} count={len(updated_ids)}")
+            return updated_ids
+        except Exception as e:
+            logger.error(f"gateway_payments_update_error | payment_id={gateway_payment_id} record_ids={record_ids} error={e}", exc_info=True)
+            raise
+
     def get_order_info_by_order_id(self, order_id: str) -> Optional[Dict]:
         """Get order information for webhook operations"""
         try:
@@ -161,6 +220,46 @@ class PaymentRepository:
             logger.error(f"get_order_info_error | order_id={order_id} error={e}", exc_info=True)
             return None
 
+    def get_order_with_payments(self, order_id: str) -> Tuple[Optional[Dict], List[Dict[str, Any]]]:
+        """
+        Get order information and all its payment records in a single query.
+        Returns (order, payment_records) shaped like get_order_info_by_order_id
+        and get_payments_for_order; order is None when the order does not exist.
+        """
+        try:
+            query = """
+                SELECT o.facility_name, o.status AS order_status, o.customer_id, o.total_amount AS order_total_amount,
+                       pd.id, pd.order_id, pd.payment_order_id, pd.payment_id, pd.payment_amount,
+                       pd.payment_date, pd.payment_mode, pd.payment_status, pd.total_amount,
+                       pd.terminal_id, pd.remarks, pd.created_at, pd.updated_at
+                FROM orders o
+                LEFT JOIN payment_details pd ON pd.order_id = o.id
+                WHERE o.order_id = :order_id
+                ORDER BY pd.created_at DESC
+            """
+            rows = execute_raw_sql(query, {"order_id": order_id})
+            if not rows:
+                return None, []
+
+            first = rows[0]
+            order = {
+                "facility_name": first["facility_name"],
+                "status": first["order_status"],
+                "customer_id": first["customer_id"],
+                "total_amount": first["order_total_amount"]
+            }
+            payment_records = []
+            for row in rows:
+                if row["id"] is None:
+                    continue
+                row.pop("order_status")
+                row.pop("order_total_amount")
+                payment_records.append(row)
+            return order, payment_records
+        except Exception as e:
+            logger.error(f"get_order_with_payments_error | order_id={order_id} error={e}", exc_info=True)
+            raise e
+
     def get_payment_by_id_and_order(self, payment_id: str, order_id: str) -> Optional[Dict[str, Any]]:
         """
         Get payment record by payment_id and order_id in a single query.
@@ -75,6 +75,7 @@ async def get_orders(
     page: int = Query(1, description="Page number (starting from 1)"),
     sort_order: str = Query("desc", description="Sort order (asc/desc)"),
     search: str = Query(None, description="Search orders by order ID"),
+    cursor: str = Query(None, description="next_cursor from the previous page, for keyset pagination"),
     authorization: str = Header(..., description="Token for authentication")
 ):
     return await validate_token_and_get_orders(
@@ -83,7 +84,8 @@ async def get_orders(
         page_size=page_size,
         page=page,
         sort_order=sort_order,
-        search=search
+        search=search,
+        cursor=cursor
     )
 
 @api_router.get("/get_orders_by_phone_number")
@@ -93,6 +95,7 @@ async def get_orders_by_phone(
     page: int = Query(1, description="Page number (starting from 1)"),
     sort_order: str = Query("desc", description="Sort order (asc/desc)"),
     search: str = Query(None, description="Search orders by order ID"),
+    cursor: str = Query(None, description="next_cursor from the previous page, for keyset pagination"),
     authorization: str = Header(..., description="Token for authentication")
 ):
     # Validate phone number format
@@ -103,7 +106,8 @@ async def get_orders_by_phone(
         page_size=page_size,
         page=page,
         sort_order=sort_order,
-        search=search
+        search=search,
+        cursor=cursor
     )
 
 @api_router.get("/order_details")
@@ -43,11 +43,12 @@ async def get_all_orders(request: Request, page_size: int = 20, page: int = 1, s
     exclude_status = Query(None, description="Exclude orders with this status"),
     current_order_limit = Query(None, description="Threshold for fetching legacy orders"),
     ph_number: str = Query(None, alias="phone_number", description="Filter by phone number"),
-    user_type: str = Query(None, description="Filter by user type")
+    user_type: str = Query(None, description="Filter by user type"),
+    cursor: str = Query(None, description="next_cursor from the previous page, for keyset pagination")
 ):
     """List orders for logged-in mobile user with optional search functionality."""
     user_id = getattr(request.state, "user_id", None)
-    return await get_all_orders_core(user_id, page_size, page, sort_order, search, exclude_status, current_order_limit, ph_number, user_type)
+    return await get_all_orders_core(user_id, page_size, page, sort_order, search, exclude_status, current_order_limit, ph_number, user_type, cursor)
 
 
 @app_router.get("/order_again", response_model=OrderAgainResponse)
@@ -1,7 +1,7 @@
 import logging
 from fastapi import APIRouter, HTTPException, Query
 from app.logging.utils import get_app_logger
-from app.dto.returns import CreateReturnRequest  # type: ignore
+from app.dto.returns import CreateReturnRequest, RETURN_ITEM_FIELDS  # type: ignore
 from app.core.order_return import create_return_core
 from app.core.constants import ReturnReasons
 from app.validations.returns import ReturnsValidator
@@ -13,7 +13,7 @@ app_router = APIRouter(tags=["app"])
 @app_router.post("/create_return")
 async def create_return(req: CreateReturnRequest):
     # Data Extraction
-    items_to_return = [{"sku": i.sku,"quantity": i.quantity,"line_reference": i.line_reference} for i in (req.items or [])]
+    items_to_return = [i.model_dump(include=RETURN_ITEM_FIELDS) for i in (req.items or [])]
     order_full_return = bool(getattr(req, "order_full_return", False))
     order_id = req.order_id
     
@@ -25,7 +25,7 @@ async def create_return(req: CreateReturnRequest):
     # Core Business Logic
     try:
         # Validate order exists and mode matches app origin
-        ReturnsValidator.validate_order_for_return(order_id, 'app')
+        await ReturnsValidator.validate_order_for_return(order_id, 'app')
         
         return await create_return_core(
             order_id=order_id,
@@ -1,18 +1,27 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+import json
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.config.settings import OMSConfigs
+configs = OMSConfigs()
 
 router = APIRouter()
 
+# Health payload is static, so serialize it once at import time
+HEALTH_RESPONSE_BODY = json.dumps({
+    "status": "healthy",
+    "version": "4.0.0",
+    "service": "rozana-oms"
+}).encode()
+
 @router.get("/health")
-async def health_check(request: Request):
+async def health_check():
+    return Response(content=HEALTH_RESPONSE_BODY, media_type="application/json")
 
-    details = {
-        "status": "healthy",
-        "version": "4.0.0",
-        "service": "rozana-oms"
-    }
-    return JSONResponse(content=details)
+# Sentry smoke-test route; only registered when explicitly enabled
+if configs.SENTRY_DEBUG_ROUTE_ENABLED:
+    @router.get("/sentry-debug")
+    async def trigger_error():
+        division_by_zero = 1 / 0
 
-@router.get("/sentry-debug")
-async def trigger_error():
-    division_by_zero = 1 / 0
\ No newline at end of file
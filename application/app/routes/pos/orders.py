@@ -17,6 +17,18 @@ from app.utils.firebase_utils import get_customer_id_from_phone_number
 pos_router = APIRouter(tags=["pos"])
 
 
+def _empty_pagination(page: int, page_size: int) -> dict:
+    """Pagination block for list responses that have no orders."""
+    return {
+        "current_page": page,
+        "page_size": page_size,
+        "total_count": 0,
+        "total_pages": 0,
+        "has_next": False,
+        "has_previous": False
+    }
+
+
 @pos_router.post("/create_order", response_model=OrderResponse)
 async def create_order(order: OrderCreate, request: Request, background_tasks: BackgroundTasks):
     """Create order via POS system."""
@@ -46,7 +58,6 @@ async def get_all_orders(
 ):
     """List orders for a logged-in POS user with optional search functionality."""
     try:
-        filters = {}
         customer_id = None
         if phone_number and phone_number.strip():
             validated_phone = validate_phone_number(phone_number.strip())
@@ -54,15 +65,8 @@ async def get_all_orders(
             if not customer_id:
                 return {
                     "orders": [],
-                    "pagination": {
-                        "current_page": page,
-                        "page_size": page_size,
-                        "total_count": 0,
-                        "total_pages": 0,
-                        "has_next": False,
-                        "has_previous": False
-                    },
-                    "message": f"No customer found for phone number: {validate_phone_number}"
+                    "pagination": _empty_pagination(page, page_size),
+                    "message": f"No customer found for phone number: {validated_phone}"
                 }
         filter_params = {
             "order_id": order_id,
@@ -70,21 +74,12 @@ async def get_all_orders(
             "customer_name": customer_name, 
             "order_mode": order_mode
         }
-        for key, value in filter_params.items():
-            if value and str(value).strip():
-                filters[key] = str(value).strip()    
+        filters = {key: stripped for key, value in filter_params.items() if value and (stripped := str(value).strip())}
         return await get_all_facility_orders_core(facility_name, page_size, page, sort_order, filters)
     except Exception as e:
         return {
             "orders": [],
-            "pagination": {
-                "current_page": page,
-                "page_size": page_size,
-                "total_count": 0,
-                "total_pages": 0,
-                "has_next": False,
-                "has_previous": False
-            },
+            "pagination": _empty_pagination(page, page_size),
             "error": f"Failed to fetch orders: {str(e)}"
         }
 
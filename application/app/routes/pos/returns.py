@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 
 from app.core.order_return import create_return_core
-from app.dto.returns import CreateReturnRequest
+from app.dto.returns import CreateReturnRequest, RETURN_ITEM_FIELDS
 from app.logging.utils import get_app_logger
 from app.validations.returns import ReturnsValidator
 
@@ -15,7 +15,7 @@ async def pos_create_return(req: CreateReturnRequest):
      Accepts the same payload as /app/v1/create_return and delegates to core.
      """
      # Data Extraction (same as app route)
-     items_to_return = [{"sku": i.sku, "quantity": i.quantity,"line_reference": i.line_reference} for i in (req.items or [])]
+     items_to_return = [i.model_dump(include=RETURN_ITEM_FIELDS) for i in (req.items or [])]
      order_full_return = bool(getattr(req, "order_full_return", False))
      order_id = req.order_id
      return_reason = req.return_reason_code if req.return_reason_code else "OTHER"
@@ -24,7 +24,7 @@ async def pos_create_return(req: CreateReturnRequest):
 
      try:
          # Validate order exists and mode matches POS origin
-         ReturnsValidator.validate_order_for_return(order_id, 'pos')
+         await ReturnsValidator.validate_order_for_return(order_id, 'pos')
          
          return await create_return_core(
              order_id=order_id,
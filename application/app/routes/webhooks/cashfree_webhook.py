@@ -3,7 +3,7 @@ Cashfree webhook routes for OMS service.
 Handles payment webhooks at /cashfree/webhook path.
 """
 
-import json
+import asyncio
 import traceback
 import hmac
 import hashlib
@@ -11,35 +11,68 @@ import base64
 from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
 from typing import Optional
-from app.core.constants import PaymentStatus, OrderStatus
+from app.core.constants import PaymentGatewayConstants
 
-# Repository and database
-from app.repository.payments import PaymentRepository
+# Database
 from app.connections.database import execute_raw_sql
-from app.services.payments.payment_processor import OrderPaymentProcessor
-from app.services.order_service import OrderService
-from app.integrations.potions_service import PotionsService
+from app.connections.redis_wrapper import get_cache_client
+from app.utils.webhook_utils import parse_webhook_body, process_gateway_payment_event
 from app.config.settings import OMSConfigs
 
 # Logger
 from app.logging.utils import get_app_logger
 logger = get_app_logger('cashfree_webhook-payments')
 
+configs = OMSConfigs()
+# Webhook secret encoded once instead of on every request
+CASHFREE_WEBHOOK_SECRET = configs.CASHFREE_WEBHOOK_SECRET.encode('utf-8')
+# How long a signed delivery is remembered so Cashfree retries of the same body are dropped
+WEBHOOK_DEDUP_TTL_SECONDS = 24 * 60 * 60
+
 # Create router for Cashfree webhook
 cashfree_webhook_router = APIRouter(prefix="", tags=["cashfree-webhook"])
 
 def verify_signature(raw_body: bytes, signature: str, timestamp: str) -> bool:
-    configs = OMSConfigs()
-    secret = getattr(configs, 'CASHFREE_WEBHOOK_SECRET', '')
-    if not secret:
+    if not CASHFREE_WEBHOOK_SECRET:
         logger.error("Cashfree webhook: CASHFREE_WEBHOOK_SECRET not configured")
         raise HTTPException(status_code=500, detail="Webhook secret not configured")
     if not timestamp:
         logger.error("Cashfree webhook: missing timestamp")
         return False
-    signed_payload = timestamp.encode() + raw_body
-    computed = base64.b64encode(hmac.new(secret.encode('utf-8'), signed_payload, hashlib.sha256).digest()).decode('utf-8')
-    return hmac.compare_digest(computed, signature)
+    # Feed timestamp and body separately so the body is never copied into a concatenated buffer
+    mac = hmac.new(CASHFREE_WEBHOOK_SECRET, timestamp.encode(), hashlib.sha256)
+    mac.update(raw_body)
+    computed = base64.b64encode(mac.digest())
+    return hmac.compare_digest(computed, signature.encode())
+
+def _dedup_key(signature: str) -> str:
+    return f"webhook:cashfree:{signature}"
+
+def claim_webhook_delivery(signature: str, timestamp: str) -> bool:
+    """
+    Record a verified delivery in Redis (SETNX) so a re-sent signed body is processed once.
+    Returns False for a duplicate; fails open when Redis is unavailable.
+    """
+    try:
+        redis_client = get_cache_client()
+        if redis_client is None:
+            logger.error("Cashfree webhook: Redis not connected, skipping duplicate check (fail-open)")
+            return True
+        return redis_client.set_if_not_exists_with_ttl(_dedup_key(signature), {"timestamp": timestamp}, WEBHOOK_DEDUP_TTL_SECONDS)
+    except Exception as e:
+        logger.error(f"Cashfree webhook: duplicate check failed, continuing | error={e}")
+        return True
+
+def release_webhook_delivery(signature: str) -> None:
+    """
+    Drop the claim of a delivery whose processing failed, so Cashfree's retry is processed.
+    """
+    try:
+        redis_client = get_cache_client()
+        if redis_client is not None:
+            redis_client.delete(_dedup_key(signature))
+    except Exception as e:
+        logger.error(f"Cashfree webhook: failed to release duplicate check key | error={e}")
 
 @cashfree_webhook_router.post("/webhook")
 async def cashfree_webhook(request: Request, background_tasks: BackgroundTasks):
@@ -61,24 +94,30 @@ async def cashfree_webhook(request: Request, background_tasks: BackgroundTasks):
             raise HTTPException(status_code=400, detail="Invalid signature")
 
         # Parse webhook data only after successful verification
-        webhook_data = json.loads(raw_body.decode('utf-8'))
+        webhook_data = parse_webhook_body(raw_body)
         event_type = webhook_data.get("type")  # cashfree sends 'type'
         
         logger.info(f"Cashfree webhook received | event={event_type}")
         
         
-        # Process only payment events
+        # Process only payment events; a processing failure returns 500 so Cashfree retries the delivery
         if event_type and event_type in ("PAYMENT_SUCCESS_WEBHOOK", "PAYMENT_FAILED_WEBHOOK"):
-            # Process with background sync tasks
-            await process_cashfree_webhook(webhook_data, background_tasks)
+            # Same signed body already processed (or being processed): nothing left to do
+            if not await asyncio.to_thread(claim_webhook_delivery, signature, timestamp):
+                logger.info(f"Cashfree webhook: duplicate delivery ignored | event={event_type}")
+                return {"status": "duplicate", "message": "Webhook already processed"}
+
+            try:
+                await process_cashfree_webhook(webhook_data, background_tasks)
+            except Exception:
+                # Not processed: Cashfree's retry of this delivery must not be dropped as a duplicate
+                await asyncio.to_thread(release_webhook_delivery, signature)
+                raise
             
             return {"status": "success", "message": "Webhook processed successfully"}
             
         return {"status": "ignored", "message": "Non-payment event"}
         
-    except json.JSONDecodeError:
-        logger.error("Cashfree webhook: invalid JSON payload")
-        raise HTTPException(status_code=400, detail="Invalid JSON payload")
     except HTTPException as he:
         # Propagate HTTP errors (e.g., 400 invalid signature) without converting to 500
         raise he
@@ -107,12 +146,7 @@ async def process_cashfree_webhook(webhook_data: dict, background_tasks: Backgro
         logger.info(f"Cashfree webhook received | gateway_order_id={gateway_order_id} | cf_payment_id={cf_payment_id} | status={payment_status}")
         
         # Map to internal status
-        if payment_status == "SUCCESS":
-            internal_payment_status = PaymentStatus.COMPLETED
-        elif payment_status == "FAILED":
-            internal_payment_status = PaymentStatus.FAILED
-        else:
-            internal_payment_status = None
+        internal_payment_status = PaymentGatewayConstants.CASHFREE_TO_PAYMENT_STATUS.get(payment_status)
         
         # Skip payments that don't have gateway_order_id
         if not gateway_order_id:
@@ -122,63 +156,7 @@ async def process_cashfree_webhook(webhook_data: dict, background_tasks: Backgro
         if internal_payment_status:
             logger.info(f"Cashfree webhook: Processing payment | cf_payment_id={cf_payment_id} gateway_order_id={gateway_order_id} status={internal_payment_status}")
 
-            # Initialize repositories and services
-            payment_repository = PaymentRepository()
-            payment_processor = OrderPaymentProcessor()
-            service = OrderService()
-            potions_service = PotionsService()
-            
-            # Fetch all orders by payment_order_id (gateway_order_id)
-            orders_to_process = payment_repository.get_orders_by_payment_order_id(gateway_order_id)
-            
-            if not orders_to_process:
-                logger.warning(f"Cashfree webhook: No orders found for gateway_order_id={gateway_order_id}")
-                return
-            
-            logger.info(f"Cashfree webhook: Processing orders | gateway_order_id={gateway_order_id} orders_count={len(orders_to_process)}")
-            
-            # Process all orders
-            for order_data in orders_to_process:
-                order_id = order_data.get('order_id')
-                facility_name = order_data.get('facility_name')
-                order_status = order_data.get('status')
-                
-                # Only process orders in DRAFT (0) or OPEN (10) status
-                if order_status not in [0, 10]:
-                    logger.info(f"Cashfree webhook: Skipping order | order_id={order_id} status={order_status}")
-                    continue
-                
-                # Fetch payment records for this order
-                payment_records = payment_repository.get_payments_for_order(order_id)
-                if not payment_records:
-                    logger.warning(f"Cashfree webhook: No payment records | order_id={order_id}")
-                    continue
-                
-                # Find Cashfree payment to validate it exists
-                cashfree_payment = None
-                for payment_record in payment_records:
-                    if payment_record.get("payment_mode", "").lower() == "cashfree":
-                        cashfree_payment = payment_record
-                        break
-                
-                if not cashfree_payment:
-                    logger.warning(f"Cashfree webhook: No Cashfree payment found | order_id={order_id}")
-                    continue
-                
-                # Process payments for this order
-                payments_status, sync_order = await payment_processor.process_razorpay_included_order_payment(order_id, payment_records, cf_payment_id, internal_payment_status)
-                
-                if payments_status:
-                    # Update order status to OPEN
-                    order_result = await service.update_order_status(order_id, OrderStatus.OPEN)
-                    logger.info(f"Cashfree webhook: Order status updated | order_id={order_id} status={int(OrderStatus.OPEN)} result={order_result}")
-
-                    if sync_order:
-                        background_tasks.add_task(potions_service.sync_order_by_id, facility_name, order_id, service)
-                        logger.info(f"Cashfree webhook: WMS sync queued | order_id={order_id}")
-                else:
-                    logger.warning(f"Cashfree webhook: Payment processing failed | order_id={order_id}")
-
+            await process_gateway_payment_event(gateway_order_id, cf_payment_id, internal_payment_status, background_tasks, "Cashfree webhook", required_payment_mode="cashfree")
         else:
             logger.error(f"Cashfree webhook: Invalid payment status | cf_payment_id={cf_payment_id} internal_status={internal_payment_status}")
         
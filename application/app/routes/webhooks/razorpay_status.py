@@ -5,13 +5,13 @@ This module handles webhook notifications from Razorpay payment gateway
 for updating payment status in the OMS system.
 """
 
-import json
 from fastapi import APIRouter, Request, BackgroundTasks, HTTPException, Header
 from fastapi.responses import JSONResponse
 
 from app.integrations.razorpay_service import razorpay_service
 from app.services.payment_service import PaymentService
-from app.core.constants import PaymentStatus
+from app.core.constants import PaymentStatus, PaymentGatewayConstants
+from app.utils.webhook_utils import parse_webhook_body
 
 # Request context
 from app.middlewares.request_context import request_context
@@ -40,7 +40,6 @@ async def razorpay_webhook(
         request_context.module_name = 'route_webhook_razorpay'
         # Get raw payload
         payload = await request.body()
-        payload_str = payload.decode('utf-8')
 
         # Verify webhook signature
         if not x_razorpay_signature:
@@ -48,7 +47,7 @@ async def razorpay_webhook(
             raise HTTPException(status_code=400, detail="Missing signature")
 
         is_verified = await razorpay_service.verify_webhook_signature(
-            payload_str,
+            payload,
             x_razorpay_signature
         )
 
@@ -57,7 +56,7 @@ async def razorpay_webhook(
             raise HTTPException(status_code=400, detail="Invalid signature")
 
         # Parse webhook payload
-        webhook_data = json.loads(payload_str)
+        webhook_data = parse_webhook_body(payload)
         event = webhook_data.get("event")
         entity = webhook_data.get("payload", {}).get("payment", {}).get("entity", {})
 
@@ -72,12 +71,7 @@ async def razorpay_webhook(
 
             if order_id and payment_id:
                 # Map Razorpay status to our payment status
-                if razorpay_status == "captured":
-                    payment_status = PaymentStatus.COMPLETED
-                elif razorpay_status == "failed":
-                    payment_status = PaymentStatus.FAILED
-                else:
-                    payment_status = PaymentStatus.PENDING
+                payment_status = PaymentGatewayConstants.RAZORPAY_TO_PAYMENT_STATUS.get(razorpay_status, PaymentStatus.PENDING)
                 
                 # Update payment status and check order completion
                 payment_service = PaymentService()
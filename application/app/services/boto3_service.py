@@ -1,5 +1,6 @@
 
 import boto3
+from functools import lru_cache
 from botocore.exceptions import ClientError, NoCredentialsError
 from typing import Optional
 import os
@@ -10,6 +11,18 @@ logger = get_app_logger('boto3_service')
 from app.config.settings import OMSConfigs
 configs = OMSConfigs()
 
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """Build the S3 client once per process; boto3 clients are thread-safe and costly to create."""
+    return boto3.client(
+        's3',
+        aws_access_key_id=configs.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=configs.AWS_SECRET_ACCESS_KEY,
+        region_name=configs.AWS_S3_REGION_NAME
+    )
+
+
 class Boto3Service:
     """
     Service class for handling AWS S3 operations, specifically for invoice file access.
@@ -26,24 +39,16 @@ class Boto3Service:
         self.bucket_name = configs.AWS_STORAGE_BUCKET_NAME
         self.expiry_seconds = configs.S3_PRESIGNED_URL_EXPIRY_SECONDS
         
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=self.aws_access_key_id,
-            aws_secret_access_key=self.aws_secret_access_key,
-            region_name=self.aws_region
-        )
+        self.s3_client = get_s3_client()
         
         logger.info(f"Boto3Service initialized for bucket: {self.bucket_name}")
     
     def get_presigned_url(self, s3_key: str) -> str:
         """
         Generate a presigned URL for downloading a file from S3.
+        Signing is local, so S3 is not contacted; a missing object surfaces as a 404 on fetch.
         """
         try:
-            # First check if the object exists
-            self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
-
-            # Generate presigned URL
             presigned_url = self.s3_client.generate_presigned_url(
                 'get_object',
                 Params={'Bucket': self.bucket_name, 'Key': s3_key},
@@ -54,13 +59,8 @@ class Boto3Service:
             return presigned_url
 
         except ClientError as e:
-            error_code = e.response['Error']['Code']
-            if error_code == '404':
-                logger.error(f"S3 object not found: {s3_key}")
-                raise Exception(f"Invoice file not found in S3: {s3_key}")
-            else:
-                logger.error(f"AWS S3 error: {str(e)}")
-                raise Exception(f"Failed to generate presigned URL: {str(e)}")
+            logger.error(f"AWS S3 error: {str(e)}")
+            raise Exception(f"Failed to generate presigned URL: {str(e)}")
         except NoCredentialsError:
             logger.error("AWS credentials not found")
             raise Exception("AWS credentials not configured properly")
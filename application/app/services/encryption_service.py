@@ -1,9 +1,9 @@
 import base64
 import os
 
-# Crypto
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
+# Crypto (OpenSSL-backed, uses AES-NI where available)
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 # Logger
 from app.logging.utils import get_app_logger
@@ -16,14 +16,17 @@ configs = OMSConfigs()
 ENCRYPTION_KEY_STR = configs.ENCRYPTION_KEY
 IV_KEY_SIZE = 16
 ENCRYPTION_KEY = ENCRYPTION_KEY_STR.encode('utf-8')[:IV_KEY_SIZE].ljust(IV_KEY_SIZE, b'\0')
+AES_BLOCK_SIZE_BITS = algorithms.AES.block_size
+# Key as the client-side scripts expect it: first 16 characters, NUL-padded
+ENCRYPTION_KEY_TEXT = ENCRYPTION_KEY_STR[:IV_KEY_SIZE].ljust(IV_KEY_SIZE, '\0')
 
 class EncryptionService:
     """Service for AES encryption using CBC mode with PKCS7 padding."""
 
     @staticmethod
     def generate_initialization_vector(length: int = IV_KEY_SIZE) -> str:
-        """Generate initialization vector as hex string (matching your standalone script)."""
-        return os.urandom(length).hex()[:length]
+        """Generate initialization vector as a hex string of `length` characters (matching your standalone script)."""
+        return os.urandom((length + 1) // 2).hex()[:length]
 
     @staticmethod
     def encrypt(plaintext: str, key: str, iv: str) -> str:
@@ -38,8 +41,11 @@ class EncryptionService:
             key_bytes = key.encode("utf-8")
             iv_bytes = iv.encode("utf-8")
 
-            cipher = AES.new(key_bytes, AES.MODE_CBC, iv_bytes)
-            ciphertext = cipher.encrypt(pad(plaintext.encode("utf-8"), AES.block_size))
+            padder = padding.PKCS7(AES_BLOCK_SIZE_BITS).padder()
+            padded = padder.update(plaintext.encode("utf-8")) + padder.finalize()
+
+            encryptor = Cipher(algorithms.AES(key_bytes), modes.CBC(iv_bytes)).encryptor()
+            ciphertext = encryptor.update(padded) + encryptor.finalize()
             return base64.b64encode(ciphertext).decode("utf-8")
         except Exception as e:
             logger.error(f"Encryption exception in encrypt(): {e}", exc_info=True)
@@ -59,8 +65,11 @@ class EncryptionService:
             iv_bytes = iv.encode("utf-8")
             ciphertext = base64.b64decode(cipher_text_b64)
 
-            cipher = AES.new(key_bytes, AES.MODE_CBC, iv_bytes)
-            plaintext = unpad(cipher.decrypt(ciphertext), AES.block_size)
+            decryptor = Cipher(algorithms.AES(key_bytes), modes.CBC(iv_bytes)).decryptor()
+            padded = decryptor.update(ciphertext) + decryptor.finalize()
+
+            unpadder = padding.PKCS7(AES_BLOCK_SIZE_BITS).unpadder()
+            plaintext = unpadder.update(padded) + unpadder.finalize()
             return plaintext.decode("utf-8")
         except Exception as e:
             logger.error(f"Decryption exception in decrypt(): {e}", exc_info=True)
@@ -75,7 +84,7 @@ class EncryptionService:
         """
         try:
             # Use the encryption key as string (matching your standalone script)
-            key = ENCRYPTION_KEY_STR[:IV_KEY_SIZE].ljust(IV_KEY_SIZE, '\0')
+            key = ENCRYPTION_KEY_TEXT
 
             # Generate initialization vector (matching your standalone script method)
             iv = EncryptionService.generate_initialization_vector(IV_KEY_SIZE)
@@ -1,64 +1,242 @@
-from typing import Optional, Any, Dict
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Any, Dict, List, Tuple
 
 from fastapi import Request
 
 from app.repository.order_meta import OrderMetaRepository
 from app.logging.utils import get_app_logger
-from app.middlewares.request_context import request_context
+from app.middlewares.request_context import get_request_context
+from app.utils.background_tasks import run_detached
 
 logger = get_app_logger("app.services.order_meta_service")
 
+# Stateless repository shared by all metadata writes
+order_meta_repository = OrderMetaRepository()
 
-def _extract_client_ip(request: Request) -> Optional[str]:
-    try:
-        xff = request.headers.get('x-forwarded-for') or request.headers.get('X-Forwarded-For')
-        if xff:
-            # Take the first IP in the list
-            return xff.split(',')[0].strip()
-        client = getattr(request, 'client', None)
-        if client and getattr(client, 'host', None):
-            return client.host
-    except Exception:
+
+@lru_cache(maxsize=4096)
+def _first_xff(xff: str) -> str:
+    """Take the first IP in an X-Forwarded-For list; cached since proxies resend the same chains."""
+    return xff.partition(',')[0].strip()
+
+
+@lru_cache(maxsize=4096)
+def _first_forwarded_for(forwarded: str) -> Optional[str]:
+    """Return the first for= address of an RFC 7239 Forwarded header, without parsing the other directives."""
+    start = forwarded.lower().find('for=')
+    if start < 0:
         return None
-    return None
+    start += 4
+    end = len(forwarded)
+    for sep in (';', ','):
+        pos = forwarded.find(sep, start)
+        if 0 <= pos < end:
+            end = pos
+    node = forwarded[start:end].strip().strip('"')
+    if node.startswith('['):
+        # Quoted IPv6, optionally with a port: "[2001:db8::1]:4711"
+        close = node.find(']')
+        return node[1:close] if close > 0 else None
+    if node.count(':') == 1:
+        # IPv4 with a port
+        node = node.split(':', 1)[0]
+    # "unknown" and obfuscated "_..." identifiers are not addresses
+    if not node or node.lower() == 'unknown' or node.startswith('_'):
+        return None
+    return node
+
+
+_IPV6_CHARS = frozenset('0123456789abcdefABCDEF:.')
+
+
+def _looks_like_ip(value: Optional[str]) -> bool:
+    """Cheap shape check for header-supplied IPv4/IPv6 text, so arbitrary strings never reach client_ip."""
+    if not value or len(value) > 45:
+        return False
+    if ':' in value:
+        return all(c in _IPV6_CHARS for c in value)
+    parts = value.split('.')
+    return len(parts) == 4 and all(p.isdigit() and len(p) <= 3 for p in parts)
 
 
+def _resolve_client_ip(xff: Optional[str], forwarded: Optional[str], client_host: Optional[str]) -> Optional[str]:
+    # Client-controlled headers are used only when they hold an IP; otherwise fall through to the next source
+    if xff:
+        xff_ip = _first_xff(xff)
+        if _looks_like_ip(xff_ip):
+            return xff_ip
+    if forwarded:
+        forwarded_ip = _first_forwarded_for(forwarded)
+        if _looks_like_ip(forwarded_ip):
+            return forwarded_ip
+    return client_host or None
+
+
+# Platform keywords, one group per platform in priority order (Android wins over Linux, etc.)
+_PLATFORM_RE = re.compile(r'(android)|(iphone|ipad|ios)|(windows)|(mac os|macintosh)|(linux)', re.IGNORECASE)
+_PLATFORMS = ('Android', 'iOS', 'Windows', 'MacOS', 'Linux')
+
+
+# User agents repeat heavily across orders from the same app builds
+@lru_cache(maxsize=4096)
 def _detect_platform(user_agent: Optional[str]) -> Optional[str]:
     if not user_agent:
         return None
-    ua = user_agent.lower()
-    if 'android' in ua:
-        return 'Android'
-    if 'iphone' in ua or 'ipad' in ua or 'ios' in ua:
-        return 'iOS'
-    if 'windows' in ua:
-        return 'Windows'
-    if 'mac os' in ua or 'macintosh' in ua:
-        return 'MacOS'
-    if 'linux' in ua:
-        return 'Linux'
-    return 'Unknown'
+    # One regex pass; the highest-priority group seen anywhere in the UA decides
+    best = None
+    for match in _PLATFORM_RE.finditer(user_agent):
+        if match.lastindex == 1:
+            return _PLATFORMS[0]
+        if best is None or match.lastindex < best:
+            best = match.lastindex
+    return _PLATFORMS[best - 1] if best else 'Unknown'
+
+
+# Raw (lowercase, as ASGI delivers them) header names read for order metadata
+_XFF_HEADER = b'x-forwarded-for'
+_FORWARDED_HEADER = b'forwarded'
+_USER_AGENT_HEADER = b'user-agent'
+
+
+def _read_client_headers(request: Request) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(x-forwarded-for, forwarded, user-agent) from one pass over the raw headers; first occurrence wins like Headers.get."""
+    xff = forwarded = user_agent = None
+    for key, value in request.headers.raw:
+        if key == _XFF_HEADER:
+            if xff is None:
+                xff = value.decode('latin-1')
+        elif key == _FORWARDED_HEADER:
+            if forwarded is None:
+                forwarded = value.decode('latin-1')
+        elif key == _USER_AGENT_HEADER:
+            if user_agent is None:
+                user_agent = value.decode('latin-1')
+    return xff, forwarded, user_agent
+
+
+def _resolve_client(xff: Optional[str], forwarded: Optional[str], client_host: Optional[str], user_agent: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(client_ip, platform) for one set of raw request values; the header parsers it calls are cached themselves."""
+    return _resolve_client_ip(xff, forwarded, client_host), _detect_platform(user_agent)
+
+
+# Metadata rows are queued and written in batches by a single flusher task
+ORDER_META_FLUSH_BATCH_SIZE = 100
+ORDER_META_FLUSH_INTERVAL_SECONDS = 0.05
+# Rows waiting for the flusher; beyond this, new rows are dropped so a stalled database cannot grow memory without bound
+ORDER_META_QUEUE_MAX_SIZE = 10000
+
+_order_meta_queue: Optional[asyncio.Queue] = None
+# Dedicated threads for the blocking inserts, so slow metadata writes never hold the default executor
+_order_meta_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="order_meta")
+_order_meta_flusher: Optional[asyncio.Task] = None
+
+
+def _persist_order_metadata_batch(rows: List[Dict[str, Any]]) -> None:
+    """Insert a batch of order_metadata rows; if the batch fails, insert them one by one so one bad row loses only itself."""
+    try:
+        order_meta_repository.bulk_create_order_meta(rows)
+        return
+    except Exception:
+        if len(rows) == 1:
+            logger.warning(f"order_metadata_persist_fail | order_id={rows[0]['order_id']}", exc_info=True)
+            return
+        logger.warning(f"order_metadata_batch_persist_fail | count={len(rows)} retrying row by row", exc_info=True)
+    for row in rows:
+        try:
+            order_meta_repository.bulk_create_order_meta([row])
+        except Exception:
+            logger.warning(f"order_metadata_persist_fail | order_id={row['order_id']}", exc_info=True)
+
+
+async def _flush_order_metadata() -> None:
+    """Drain the queue: wait for a row, gather more for up to the flush interval, then insert them together."""
+    loop = asyncio.get_running_loop()
+    while True:
+        rows = [await _order_meta_queue.get()]
+        deadline = loop.time() + ORDER_META_FLUSH_INTERVAL_SECONDS
+        try:
+            while len(rows) < ORDER_META_FLUSH_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(await asyncio.wait_for(_order_meta_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Stopped mid-batch: hand the collected rows back for the shutdown drain
+            for row in rows:
+                try:
+                    _order_meta_queue.put_nowait(row)
+                except asyncio.QueueFull:
+                    logger.warning(f"order_metadata_queue_full | order_id={row['order_id']} dropped")
+            raise
+        await asyncio.get_running_loop().run_in_executor(_order_meta_executor, _persist_order_metadata_batch, rows)
+
+
+def start_order_meta_flusher() -> None:
+    """Create the metadata queue and its flusher task; call once at application startup."""
+    global _order_meta_queue, _order_meta_flusher
+    _order_meta_queue = asyncio.Queue(maxsize=ORDER_META_QUEUE_MAX_SIZE)
+    _order_meta_flusher = run_detached(_flush_order_metadata(), name="order_meta_flusher")
+
+
+async def stop_order_meta_flusher() -> None:
+    """Stop the flusher and write any rows still queued; call at application shutdown."""
+    global _order_meta_queue, _order_meta_flusher
+    if _order_meta_flusher is None:
+        return
+    _order_meta_flusher.cancel()
+    try:
+        await _order_meta_flusher
+    except asyncio.CancelledError:
+        pass
+    rows = []
+    while not _order_meta_queue.empty():
+        rows.append(_order_meta_queue.get_nowait())
+    _order_meta_queue, _order_meta_flusher = None, None
+    if rows:
+        await asyncio.get_running_loop().run_in_executor(_order_meta_executor, _persist_order_metadata_batch, rows)
 
 
 class OrderMetaService:
     @staticmethod
     def save_order_metadata(order_internal_id: int, request: Request, origin: str, metadata: Optional[Dict[str, Any]]) -> None:
-        """Best-effort persistence of order metadata. Never raises to caller."""
+        """Best-effort persistence of order metadata. Never raises to caller.
+
+        Request headers and context are read here; the row is queued for the batch flusher
+        so the order response does not wait for the insert.
+        """
         try:
-            client_ip = _extract_client_ip(request)
-            user_agent = request.headers.get('user-agent')
-            device = metadata.get("device_id")
-            longitude = metadata.get("longitude")
-            latitude = metadata.get("latitude")
-            platform = _detect_platform(user_agent)
-            app_version = request_context.app_version or ''
-            web_version = request_context.web_version or ''
-
-            repository = OrderMetaRepository()
-            repository.create_order_meta(order_id=order_internal_id, client_ip=client_ip, user_agent=user_agent, device=device,
-                                                platform=platform, app_version=app_version, web_version=web_version, longitude=longitude, latitude=latitude)
+            # Orders without client metadata still get a row
+            metadata = metadata or {}
+            xff, forwarded, user_agent = _read_client_headers(request)
+            # request.client is None when the server cannot tell the peer address
+            client = request.client
+            client_ip, platform = _resolve_client(xff, forwarded, client.host if client else None, user_agent)
+            ctx = get_request_context()
+            row = OrderMetaRepository.order_meta_params(
+                order_id=order_internal_id,
+                client_ip=client_ip,
+                user_agent=user_agent,
+                device=metadata.get("device_id"),
+                platform=platform,
+                app_version=ctx.app_version or '',
+                web_version=ctx.web_version or '',
+                longitude=metadata.get("longitude"),
+                latitude=metadata.get("latitude"),
+            )
+            if _order_meta_queue is not None:
+                try:
+                    _order_meta_queue.put_nowait(row)
+                except asyncio.QueueFull:
+                    logger.warning(f"order_metadata_queue_full | order_id={order_internal_id} dropped")
+            else:
+                # Flusher not started (e.g. outside the app lifespan): write this row on its own
+                asyncio.get_running_loop().run_in_executor(_order_meta_executor, _persist_order_metadata_batch, [row])
         except Exception:
             # Do not block main flow on metadata errors
             logger.debug("order_metadata_persist_fail", exc_info=True)
-
-
@@ -1,12 +1,17 @@
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List, Tuple
 from fastapi import HTTPException
 from app.core.constants import OrderStatus, PaymentStatus, RefundStatus, ReturnTypeConstants
-from app.utils.order_utils import can_cancel_order
+from app.utils.order_utils import can_cancel_order, encode_order_cursor, decode_order_cursor
 from app.connections.database import execute_raw_sql_readonly
 from app.validations.orders import OrderCreateValidator
 from app.services.legacy_orders import LegacyOrderService
 from app.services.oms_orders import OMSOrderService
 from app.utils.datetime_helpers import format_datetime_ist
+from app.utils.order_list_cache import get_cached_order_list, cache_order_list
+from app.connections.redis_wrapper import get_cache_client
 
 # Request context
 from app.middlewares.request_context import request_context
@@ -18,6 +23,21 @@ logger = get_app_logger(__name__)
 from app.config.settings import OMSConfigs
 configs = OMSConfigs()
 
+# Threads for legacy (MariaDB) lookups that overlap with OMS queries of the same request
+_legacy_orders_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="legacy_orders")
+
+# Facility order totals per (facility, filters) are kept in Redis; the list pages themselves are always read live
+FACILITY_ORDERS_COUNT_CACHE_TTL_SECONDS = 60
+FACILITY_ORDERS_COUNT_CACHE_PREFIX = "facility_orders_count"
+
+# order_items columns of the item list endpoints; numeric amounts are cast to float in SQL
+ORDER_ITEM_COLUMNS = """oi.id, oi.order_id, oi.sku, oi.name, oi.quantity,
+                       COALESCE(oi.pos_extra_quantity, 0)::float8 AS pos_extra_quantity,
+                       oi.unit_price::float8 AS unit_price, oi.sale_price::float8 AS sale_price, oi.status,
+                       oi.cgst::float8 AS cgst, oi.sgst::float8 AS sgst, oi.igst::float8 AS igst, oi.cess::float8 AS cess,
+                       oi.is_returnable, oi.return_type, oi.return_window,
+                       oi.created_at, oi.updated_at, oi.hsn_code"""
+
 class OrderQueryService:
     """Service for handling order queries (Read operations) using SQLAlchemy raw SQL"""
 
@@ -33,26 +53,92 @@ class OrderQueryService:
         """Get single order by order_id from database with complete details"""
         
         try:
+            # One round trip: the order row plus each child collection aggregated as JSON.
+            # JSON numbers arrive as int/float and timestamps as ISO strings, which the
+            # float() and format_datetime_ist conversions below already accept.
             sql = """
                 SELECT o.id, o.order_id, o.customer_id, o.customer_name,
                        o.facility_id, o.facility_name,
                        o.status, o.total_amount, o.eta, o.order_mode, o.user_type,
                        o.created_at, o.updated_at, o.delivery_charge, o.packaging_charge,
-                       oi.id as item_id, oi.sku, oi.typesense_id, oi.name, oi.quantity, oi.pos_extra_quantity, oi.unit_price, oi.sale_price,
-                       oi.status AS item_status, oi.cgst, oi.sgst, oi.igst, oi.cess, 
-                       oi.is_returnable, oi.return_type, oi.return_window, oi.created_at as item_created_at, 
-                       oi.updated_at as item_updated_at, oi.fulfilled_quantity, oi.delivered_quantity,
-                       oi.cancelled_quantity, oi.unfulfilled_quantity, oi.hsn_code,
-                       oa.full_name, oa.phone_number, oa.address_line1, oa.address_line2,
-                       oa.city, oa.state, oa.postal_code, oa.country, oa.type_of_address,
-                       oa.longitude, oa.latitude, oi.thumbnail_url
+                       (
+                           SELECT COALESCE(json_agg(i), '[]'::json)
+                           FROM (
+                               SELECT oi.id as item_id, oi.sku, oi.typesense_id, oi.name, oi.quantity, oi.pos_extra_quantity, oi.unit_price, oi.sale_price,
+                                      oi.status AS item_status, oi.cgst, oi.sgst, oi.igst, oi.cess,
+                                      oi.is_returnable, oi.return_type, oi.return_window, oi.created_at as item_created_at,
+                                      oi.updated_at as item_updated_at, oi.fulfilled_quantity, oi.delivered_quantity,
+                                      -- WMS-cancelled items report their cancelled quantity as unfulfilled
+                                      CASE WHEN oi.status = :wms_canceled THEN oi.cancelled_quantity
+                                           ELSE oi.unfulfilled_quantity END AS unfulfilled_quantity,
+                                      oi.hsn_code, oi.thumbnail_url
+                               FROM order_items oi
+                               WHERE oi.order_id = o.id
+                               ORDER BY oi.id
+                           ) i
+                       ) AS items,
+                       (
+                           SELECT row_to_json(a)
+                           FROM (
+                               SELECT oa.full_name, oa.phone_number, oa.address_line1, oa.address_line2,
+                                      oa.city, oa.state, oa.postal_code, oa.country, oa.type_of_address,
+                                      oa.longitude, oa.latitude
+                               FROM order_addresses oa
+                               WHERE oa.order_id = o.id AND COALESCE(oa.full_name, '') <> ''
+                               ORDER BY oa.id
+                               LIMIT 1
+                           ) a
+                       ) AS address,
+                       (
+                           SELECT COALESCE(json_agg(p), '[]'::json)
+                           FROM (
+                               SELECT pd.id as payment_pk, pd.payment_id, pd.payment_amount, pd.payment_mode, pd.payment_status,
+                                      pd.payment_order_id, pd.terminal_id
+                               FROM payment_details pd
+                               WHERE pd.order_id = o.id
+                               ORDER BY pd.created_at DESC
+                               LIMIT 4
+                           ) p
+                       ) AS payments,
+                       (
+                           SELECT COALESCE(json_agg(inv), '[]'::json)
+                           FROM (
+                               SELECT COALESCE(id.raven_link, '') AS raven_link,
+                                      COALESCE(id.invoice_s3_url, '') AS invoice_s3_url
+                               FROM invoice_details id
+                               WHERE id.order_id = o.id
+                               ORDER BY id.created_at DESC
+                           ) inv
+                       ) AS invoices,
+                       (
+                           SELECT COALESCE(json_agg(rf), '[]'::json)
+                           FROM (
+                               SELECT rd.payment_id as payment_pk, rd.refund_id, rd.refund_amount, rd.refund_currency,
+                                      rd.refund_status, rd.refund_date, pd.payment_id
+                               FROM refund_details rd
+                               JOIN payment_details pd ON rd.payment_id = pd.id
+                               WHERE pd.order_id = o.id
+                               and rd.refund_id not like '%cod_amount_unfulfilled_%'
+                               ORDER BY rd.created_at DESC
+                           ) rf
+                       ) AS refunds,
+                       (
+                           SELECT COALESCE(json_agg(rt), '[]'::json)
+                           FROM (
+                               SELECT r.return_reference, r.return_type, r.return_reason, r.comments, r.status,
+                                      r.total_refund_amount, r.refund_status, r.created_at, r.updated_at,
+                                      ri.sku, ri.quantity_returned, ri.refund_amount
+                               FROM returns r
+                               LEFT JOIN return_items ri ON ri.return_id = r.id
+                               WHERE r.order_id = o.id
+                               ORDER BY r.created_at DESC, ri.id
+                           ) rt
+                       ) AS returns
                 FROM orders o
-                LEFT JOIN order_items oi ON oi.order_id = o.id
-                LEFT JOIN order_addresses oa ON oa.order_id = o.id
                 WHERE o.order_id = :order_id
             """
-            
-            rows = execute_raw_sql_readonly(sql, {'order_id': order_id})
+
+            rows = execute_raw_sql_readonly(sql, {'order_id': order_id, 'wms_canceled': OrderStatus.WMS_CANCELED})
             if not rows:
                 return None
 
@@ -60,34 +146,32 @@ class OrderQueryService:
             address = None
             items = []
 
-            for record in rows:
-                if address is None and record.get("full_name"):
-                    address = {
-                        "full_name": record.get("full_name"),
-                        "phone_number": record.get("phone_number"),
-                        "address_line1": record.get("address_line1"),
-                        "address_line2": record.get("address_line2"),
-                        "city": record.get("city"),
-                        "state": record.get("state"),
-                        "postal_code": record.get("postal_code"),
-                        "country": record.get("country"),
-                        "type_of_address": record.get("type_of_address"),
-                        "longitude": float(record.get("longitude")) if record.get("longitude") is not None else None,
-                        "latitude": float(record.get("latitude")) if record.get("latitude") is not None else None
-                    }
+            address_row = header.get("address")
+            if address_row:
+                address = {
+                    "full_name": address_row.get("full_name"),
+                    "phone_number": address_row.get("phone_number"),
+                    "address_line1": address_row.get("address_line1"),
+                    "address_line2": address_row.get("address_line2"),
+                    "city": address_row.get("city"),
+                    "state": address_row.get("state"),
+                    "postal_code": address_row.get("postal_code"),
+                    "country": address_row.get("country"),
+                    "type_of_address": address_row.get("type_of_address"),
+                    "longitude": float(address_row.get("longitude")) if address_row.get("longitude") is not None else None,
+                    "latitude": float(address_row.get("latitude")) if address_row.get("latitude") is not None else None
+                }
 
-                if record.get("sku"):
-                    # Get return type interpretation
-                    return_type_code = record.get("return_type", "00")
-                    return_type_description = self._get_return_type_description(return_type_code)
-                    if record.get("item_status") == OrderStatus.WMS_CANCELED:
-                        unfulfilled_quantity = float(record.get("cancelled_quantity", 0))
-                    else:
-                        unfulfilled_quantity = float(record.get("unfulfilled_quantity", 0))
+            # Loop-invariant lookups, bound once for all items
+            order_pk = header.get("id")
+            status_name = OrderStatus.get_customer_status_name
+            return_type_name = self._get_return_type_description
 
+            for record in header.get("items") or []:
+                if record.get("sku"):
                     items.append({
                         "id": record.get("item_id"),
-                        "order_id": header.get("id"),
+                        "order_id": order_pk,
                         "sku": record.get("sku"),
                         "typesense_id": record.get("typesense_id"),  # Add typesense_id
                         "name": record.get("name"),
@@ -95,7 +179,7 @@ class OrderQueryService:
                         "pos_extra_quantity": float(record.get("pos_extra_quantity", 0)),
                         "unit_price": float(record.get("unit_price", 0)),
                         "sale_price": float(record.get("sale_price", 0)),
-                        "status": OrderStatus.get_customer_status_name(record.get("item_status")),
+                        "status": status_name(record.get("item_status")),
                         "created_at": format_datetime_ist(record.get("item_created_at")),
                         "updated_at": format_datetime_ist(record.get("item_updated_at")),
                         "cgst": float(record.get("cgst", 0)),
@@ -103,64 +187,24 @@ class OrderQueryService:
                         "igst": float(record.get("igst", 0)),
                         "cess": float(record.get("cess", 0)),
                         "is_returnable": record.get("is_returnable", True),
-                        "return_type": return_type_description,
+                        "return_type": return_type_name(record.get("return_type", "00")),
                         "return_window": record.get("return_window", 7),
                         "fulfilled_quantity": float(record.get("fulfilled_quantity", 0)),
                         "delivered_quantity": float(record.get("delivered_quantity", 0)),
-                        "unfulfilled_quantity": unfulfilled_quantity,
+                        "unfulfilled_quantity": float(record.get("unfulfilled_quantity", 0)),
                         "thumbnail_url": record.get("thumbnail_url"),
                         "hsn_code": record.get("hsn_code", "")  # HSN code from database
                     })
 
-            # Get payment details
-            payment_sql = """
-                SELECT pd.id as payment_pk, pd.payment_id, pd.payment_amount, pd.payment_mode, pd.payment_status,
-                       pd.payment_order_id, pd.terminal_id
-                FROM payment_details pd
-                JOIN orders o ON o.id = pd.order_id
-                WHERE o.order_id = :order_id
-                ORDER BY pd.created_at DESC
-                LIMIT 4
-            """
-
-            payment_rows = execute_raw_sql_readonly(payment_sql, {"order_id": order_id})
-
-            # Get invoice details
-            invoice_sql = """
-                SELECT id.raven_link, id.invoice_s3_url
-                FROM invoice_details id
-                JOIN orders o ON o.id = id.order_id
-                WHERE o.order_id = :order_id
-                ORDER BY id.created_at DESC
-            """
-
-            invoice_rows = execute_raw_sql_readonly(invoice_sql, {"order_id": order_id})
-            invoices = []
-            for invoice_row in invoice_rows:
-                invoice_url = invoice_row.get("invoice_s3_url") if invoice_row.get("invoice_s3_url") else ""
-                raven_link = invoice_row.get("raven_link") if invoice_row.get("raven_link") else ""
-                invoices.append({
-                    "raven_link": raven_link,
-                    "invoice_s3_url": invoice_url
-                })
+            # NULL links are already coalesced to "" in SQL
+            invoices = [
+                {"raven_link": invoice_row["raven_link"], "invoice_s3_url": invoice_row["invoice_s3_url"]}
+                for invoice_row in header.get("invoices") or []
+            ]
 
-            # Get refunds for payments
-            refund_sql = """
-                SELECT rd.payment_id as payment_pk, rd.refund_id, rd.refund_amount, rd.refund_currency,
-                       rd.refund_status, rd.refund_date, pd.payment_id
-                FROM refund_details rd
-                JOIN payment_details pd ON rd.payment_id = pd.id
-                JOIN orders o ON o.id = pd.order_id
-                WHERE o.order_id = :order_id
-                and rd.refund_id not like '%cod_amount_unfulfilled_%'
-                ORDER BY rd.created_at DESC
-            """
-
-            refund_rows = execute_raw_sql_readonly(refund_sql, {"order_id": order_id})
-            
             # Create top-level refunds array
             refunds = []
-            for refund_row in refund_rows:
+            for refund_row in header.get("refunds") or []:
                 refund_data = {
                     "refund_id": refund_row.get("refund_id"),
                     "payment_id": refund_row.get("payment_id"),
@@ -173,7 +217,7 @@ class OrderQueryService:
 
             # Create payments without nested refunds
             payments = []
-            for payment_row in payment_rows:
+            for payment_row in header.get("payments") or []:
                 payments.append({
                     "payment_id": payment_row.get("payment_id"),
                     "payment_amount": float(payment_row.get("payment_amount", 0)),
@@ -183,23 +227,12 @@ class OrderQueryService:
                     "terminal_id": payment_row.get("terminal_id")
                 })
 
-            # Get returns
-            returns_sql = """
-                SELECT r.return_reference, r.return_type, r.return_reason, r.comments, r.status,
-                       r.total_refund_amount, r.refund_status, r.created_at, r.updated_at,
-                       ri.sku, ri.quantity_returned, ri.refund_amount
-                FROM returns r
-                LEFT JOIN return_items ri ON ri.return_id = r.id
-                JOIN orders o ON o.id = r.order_id
-                WHERE o.order_id = :order_id
-                ORDER BY r.created_at DESC, ri.id
-            """
-
-            returns_rows = execute_raw_sql_readonly(returns_sql, {"order_id": order_id})
+            # Build returns (one JSON row per return item)
             returns = []
-            for row in returns_rows:
+            returns_by_ref: Dict[str, Dict] = {}
+            for row in header.get("returns") or []:
                 ref = row.get("return_reference")
-                existing = next((r for r in returns if r["return_reference"] == ref), None)
+                existing = returns_by_ref.get(ref)
                 if not existing:
                     existing = {
                         "return_reference": ref,
@@ -213,6 +246,7 @@ class OrderQueryService:
                         "updated_at": format_datetime_ist(row.get("updated_at")),
                         "items": []
                     }
+                    returns_by_ref[ref] = existing
                     returns.append(existing)
                 if row.get("sku"):
                     existing["items"].append({
@@ -274,19 +308,29 @@ class OrderQueryService:
             usertype_params['user_type'] = user_type.strip()
         
         # Prepare order clause
-        order_clause = "ORDER BY o.created_at DESC" if sort_order.lower() == "desc" else "ORDER BY o.created_at ASC"
+        # id breaks created_at ties so pages (and keyset cursors) have a total order
+        order_clause = "ORDER BY o.created_at DESC, o.id DESC" if sort_order.lower() == "desc" else "ORDER BY o.created_at ASC, o.id ASC"
 
         clauses = (search_clause, exclude_clause, usertype_clause, order_clause)
         params = (search_params, exclude_params, usertype_params)
         return clauses, params
 
 
-    def get_all_orders(self, user_id: str, page_size: int = 20, page: int = 1, sort_order: str = "desc", search: str = None, exclude_statuses: str = None, current_order_limit: str = None, ph_number: str = None, user_type: str = None) -> Dict:
-        """Get all orders for a user with pagination using SQLAlchemy raw SQL"""
+    def get_all_orders(self, user_id: str, page_size: int = 20, page: int = 1, sort_order: str = "desc", search: str = None, exclude_statuses: str = None, current_order_limit: str = None, ph_number: str = None, user_type: str = None, cursor: str = None) -> Dict:
+        """Get all orders for a user with pagination using SQLAlchemy raw SQL.
+
+        When the user has only OMS orders on the list, the pagination block carries a next_cursor;
+        passing it back as cursor fetches the next page by keyset instead of OFFSET.
+        """
 
         try:
             validator = OrderCreateValidator(user_id=user_id)
 
+            list_params = (page_size, page, sort_order, search, exclude_statuses, ph_number, user_type, cursor)
+            cached = get_cached_order_list(user_id, list_params)
+            if cached is not None:
+                return cached
+
             clause, params = self.get_clauses(search, exclude_statuses, sort_order, user_type)
             oms_service = OMSOrderService()
             total_count_oms = oms_service.get_oms_orders_count(user_id, clause, params)
@@ -299,29 +343,39 @@ class OrderQueryService:
             total_count_legacy = 0
             items_by_order = {}
             rows = []
-            if total_count_oms >= current_order_limit:
+            next_cursor = None
+            if cursor or total_count_oms >= current_order_limit:
                 total_count = total_count_oms
-                rows = oms_service.get_oms_orders(user_id, page_size, page, clause, params)
-                order_ids = [row.get("id") for row in rows]
-                if order_ids:
-                    items_by_order = oms_service.get_oms_order_items_by_order_ids(order_ids)
+                # OMS rows carry their history_items from the page query itself
+                if cursor:
+                    # One extra row tells whether another keyset page follows
+                    rows = oms_service.get_oms_orders(user_id, page_size + 1, page, clause, params, decode_order_cursor(cursor))
+                    has_more = len(rows) > page_size
+                    rows = rows[:page_size]
+                else:
+                    rows = oms_service.get_oms_orders(user_id, page_size, page, clause, params)
+                    has_more = page * page_size < total_count
+                if has_more and rows:
+                    next_cursor = encode_order_cursor(rows[-1].get("created_at"), rows[-1].get("id"))
             else:
                 # Get OMS orders first, then fill remaining with legacy orders
+                has_phone = bool(ph_number and str(ph_number).strip())
+                legacy_service = LegacyOrderService()
+                # The legacy count (MariaDB) does not depend on the OMS page (Postgres); run both at once
+                legacy_count_future = _legacy_orders_executor.submit(
+                    contextvars.copy_context().run, legacy_service.count_legacy_orders_by_phone, ph_number
+                ) if has_phone else None
+
                 oms_rows = []
-                oms_items_by_order = {}
                 if total_count_oms > 0:
                     oms_rows = oms_service.get_oms_orders(user_id, page_size, page, clause, params)
-                    oms_order_ids = [row.get("id") for row in oms_rows]
-                    if oms_order_ids:
-                        oms_items_by_order = oms_service.get_oms_order_items_by_order_ids(oms_order_ids)
 
                 remaining_slots = page_size - len(oms_rows)
                 legacy_rows = []
                 legacy_items_by_order = {}
                 total_count_legacy = 0
-                if ph_number and str(ph_number).strip():
-                    legacy_service = LegacyOrderService()
-                    total_count_legacy = legacy_service.count_legacy_orders_by_phone(ph_number)
+                if has_phone:
+                    total_count_legacy = legacy_count_future.result()
                     if remaining_slots > 0 and total_count_legacy > 0:
                         legacy_rows = legacy_service.get_legacy_orders_by_phone(ph_number, remaining_slots, page)
                         legacy_order_ids = [row.get("id") for row in legacy_rows]
@@ -333,14 +387,17 @@ class OrderQueryService:
 
                 base_url = getattr(configs, 'AWS_OLD_BASE_URL', '')
                 if base_url and legacy_items_by_order:
-                    for oid, items in legacy_items_by_order.items():
+                    base = base_url.rstrip('/') + '/'
+                    for items in legacy_items_by_order.values():
                         for item in items:
                             tu = item.get('thumbnail_url')
-                            if tu and not str(tu).lower().startswith('http'):
-                                item['thumbnail_url'] = base_url.rstrip('/') + '/' + str(tu).lstrip('/')
+                            # Relative legacy paths get the S3 base; only the 4-char prefix is case-folded
+                            if tu and str(tu)[:4].lower() != 'http':
+                                item['thumbnail_url'] = f"{base}{str(tu).lstrip('/')}"
 
-                rows = oms_rows + legacy_rows
-                items_by_order = {**oms_items_by_order, **legacy_items_by_order}
+                rows = oms_rows
+                rows.extend(legacy_rows)
+                items_by_order = legacy_items_by_order
                 total_count = total_count_oms + total_count_legacy
                 logger.info(f"total_count for user_id={user_id}={total_count}")
 
@@ -356,11 +413,13 @@ class OrderQueryService:
                         "total_count": 0,
                         "total_pages": 0,
                         "has_next": False,
-                        "has_previous": False
+                        "has_previous": False,
+                        "next_cursor": None
                     }
                 }
 
             orders = []
+            status_name = OrderStatus.get_customer_status_name
             for row in rows:
                 order_id = row.get("id")
                 promotion_type = row.get('promotion_type', '')
@@ -378,7 +437,7 @@ class OrderQueryService:
                     "customer_name": row.get("customer_name"),
                     "facility_id": row.get("facility_id"),
                     "facility_name": row.get("facility_name"),
-                    "status": OrderStatus.get_customer_status_name(row.get("status")),
+                    "status": status_name(row.get("status")),
                     "total_amount": total_amount,
                     "eta": format_datetime_ist(row.get("eta")),
                     "created_at": format_datetime_ist(row.get("created_at")),
@@ -387,20 +446,23 @@ class OrderQueryService:
                     "latitude": float(latitude) if latitude is not None and latitude != '' else 0.0,
                     "order_mode": row.get("order_mode"),
                     "user_type": row.get("user_type"),
-                    "history_items": items_by_order.get(order_id, [])
+                    "history_items": row["history_items"] if "history_items" in row else items_by_order.get(order_id, [])
                 })
 
-            return {
+            result = {
                 "orders": orders,
                 "pagination": {
                     "current_page": page,
                     "page_size": page_size,
                     "total_count": total_count,
                     "total_pages": total_pages,
-                    "has_next": page < total_pages,
-                    "has_previous": page > 1
+                    "has_next": next_cursor is not None if cursor else page < total_pages,
+                    "has_previous": bool(cursor) or page > 1,
+                    "next_cursor": next_cursor
                 }
             }
+            cache_order_list(user_id, list_params, result)
+            return result
 
         except ValueError as ve:
             logger.warning(f"Validation error for user {user_id}: {ve}")
@@ -421,7 +483,7 @@ class OrderQueryService:
             legacy_order_ids = [row.get("id") for row in legacy_rows]
             if legacy_order_ids:
                 legacy_items_by_order = legacy_service.get_legacy_order_items_by_order_ids(legacy_order_ids)
-        logger.info(f"legacy_rows={legacy_rows}, legacy_items_by_order={legacy_items_by_order}, total_count_legacy={total_count_legacy}")
+        logger.info(f"legacy_orders_fetched | legacy_user_id={legacy_user_id} rows={len(legacy_rows)} orders_with_items={len(legacy_items_by_order)} total_count_legacy={total_count_legacy}")
         return legacy_rows, legacy_items_by_order, total_count_legacy
 
     def get_order_again_products(self, user_id: str, page_size: int = 20, page: int = 1):
@@ -430,17 +492,44 @@ class OrderQueryService:
             validator = OrderCreateValidator(user_id=user_id)
             validator.validate_page_size(page_size, page)
 
-            # First, get the total count
-            count_sql = """
-                SELECT COUNT(DISTINCT oi.sku) as total_count
-                FROM orders o
-                JOIN order_items oi 
-                    ON oi.order_id = o.id
-                WHERE o.customer_id = :user_id
+            # Page of SKUs ranked by order count; the window count carries the total on every row
+            recent_sql = """
+                SELECT s.sku, s.order_count, s.total_count
+                FROM (
+                    SELECT
+                        oi.sku,
+                        COUNT(*) AS order_count,
+                        COUNT(*) OVER () AS total_count
+                    FROM orders o
+                    JOIN order_items oi
+                        ON oi.order_id = o.id
+                    WHERE o.customer_id = :user_id
+                    GROUP BY oi.sku
+                ) s
+                ORDER BY s.order_count DESC
+                LIMIT :limit OFFSET :offset
             """
 
-            count_rows = execute_raw_sql_readonly(count_sql, {"user_id": user_id})
-            total_count = count_rows[0].get('total_count', 0) if count_rows else 0
+            rows = execute_raw_sql_readonly(
+                recent_sql,
+                {"user_id": user_id, "limit": page_size, "offset": (page - 1) * page_size}
+            )
+
+            if rows:
+                total_count = rows[0].get('total_count', 0)
+            elif page > 1:
+                # Past the last page: count separately so the page bounds error reports the real total
+                count_sql = """
+                    SELECT COUNT(DISTINCT oi.sku) as total_count
+                    FROM orders o
+                    JOIN order_items oi
+                        ON oi.order_id = o.id
+                    WHERE o.customer_id = :user_id
+                """
+                count_rows = execute_raw_sql_readonly(count_sql, {"user_id": user_id})
+                total_count = count_rows[0].get('total_count', 0) if count_rows else 0
+            else:
+                total_count = 0
 
             # Validate page bounds
             total_pages = validator.validate_pagination_params(page_size, page, total_count)
@@ -459,25 +548,6 @@ class OrderQueryService:
                     }
                 }
 
-            # Then get the paginated results
-            recent_sql = """
-                SELECT 
-                    oi.sku,
-                    COUNT(*) AS order_count
-                FROM orders o
-                JOIN order_items oi 
-                    ON oi.order_id = o.id
-                WHERE o.customer_id = :user_id
-                GROUP BY oi.sku
-                ORDER BY order_count DESC
-                LIMIT :limit OFFSET :offset
-            """
-
-            rows = execute_raw_sql_readonly(
-                recent_sql, 
-                {"user_id": user_id, "limit": page_size, "offset": (page - 1) * page_size}
-            )
-
             products = [row.get("sku") for row in rows if row.get("sku")]
 
             return {
@@ -503,6 +573,36 @@ class OrderQueryService:
             return {"products": [], "pagination": {"current_page": page, "page_size": page_size, "total_count": 0, "total_pages": 0, "has_next": False, "has_previous": False}}
 
 
+    def _get_facility_orders_count(self, facility_name: str, filter_clauses: List[str], filter_params: Dict) -> int:
+        """Count a facility's orders for the given filters, reusing a count made in the last FACILITY_ORDERS_COUNT_CACHE_TTL_SECONDS."""
+        cache_key = f"{FACILITY_ORDERS_COUNT_CACHE_PREFIX}:{facility_name}:{json.dumps(sorted(filter_params.items()), default=str)}"
+        redis_client = None
+        try:
+            redis_client = get_cache_client()
+            cached = redis_client.get(cache_key) if redis_client else None
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"facility_orders_count_cache_get_error | facility_name={facility_name} error={e}")
+
+        count_sql = """
+            SELECT COUNT(*) as total_count
+            FROM orders o
+            WHERE o.facility_name = :facility_name
+        """
+        for filter_clause in filter_clauses:
+            count_sql += filter_clause
+
+        count_rows = execute_raw_sql_readonly(count_sql, {'facility_name': facility_name, **filter_params})
+        total_count = count_rows[0].get('total_count', 0) if count_rows else 0
+
+        try:
+            if redis_client:
+                redis_client.set_with_ttl(cache_key, total_count, FACILITY_ORDERS_COUNT_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"facility_orders_count_cache_set_error | facility_name={facility_name} error={e}")
+        return total_count
+
     def get_all_facility_orders(self, facility_name: str, page_size: int = 10, page: int = 1, sort_order: str = "desc", filters: dict = None) -> Dict:
         """Get all orders for a facility with pagination and optional search using SQLAlchemy raw SQL"""
 
@@ -540,24 +640,33 @@ class OrderQueryService:
             # Prepare order clause
             order_clause = "ORDER BY o.created_at DESC" if sort_order.lower() == "desc" else "ORDER BY o.created_at ASC"
 
-            # First, get the total count
-            count_sql = """
-                SELECT COUNT(*) as total_count
+            # Build main query with proper WHERE clause
+            sql = """
+                SELECT o.id, o.order_id, o.customer_id, o.customer_name,
+                       o.facility_id, o.facility_name,
+                       o.status, o.total_amount, o.eta,
+                       o.created_at, o.updated_at, o.order_mode, o.promotion_discount, o.promotion_type
                 FROM orders o
                 WHERE o.facility_name = :facility_name
             """
             for filter_clause in filter_clauses:
-                count_sql += filter_clause
+                sql += filter_clause
+            sql += " " + order_clause + " LIMIT :limit OFFSET :offset"
 
-            count_params = {'facility_name': facility_name, **filter_params}
-            count_rows = execute_raw_sql_readonly(count_sql, count_params)
-            total_count = count_rows[0].get('total_count', 0) if count_rows else 0
+            # One extra row tells whether a next page exists without counting
+            sql_params = {
+                'facility_name': facility_name,
+                'limit': page_size + 1,
+                'offset': (page - 1) * page_size,
+                **filter_params
+            }
 
-            # Validate page bounds
-            total_pages = validator.validate_pagination_params(page_size, page, total_count)
+            rows = execute_raw_sql_readonly(sql, sql_params)
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
 
             # If no orders, return empty result
-            if total_count == 0:
+            if not rows and page == 1:
                 return {
                     "orders": [],
                     "pagination": {
@@ -570,29 +679,18 @@ class OrderQueryService:
                     }
                 }
 
-            # Build main query with proper WHERE clause
-            sql = """
-                SELECT o.id, o.order_id, o.customer_id, o.customer_name,
-                       o.facility_id, o.facility_name,
-                       o.status, o.total_amount, o.eta,
-                       o.created_at, o.updated_at, o.order_mode, o.promotion_discount, o.promotion_type
-                FROM orders o
-                WHERE o.facility_name = :facility_name
-            """
-            for filter_clause in filter_clauses:
-                sql += filter_clause
-            sql += " " + order_clause + " LIMIT :limit OFFSET :offset"
+            # The total is only for display, so a recently counted value is good enough;
+            # it never reports fewer orders than this page has shown to exist
+            total_count = max(
+                self._get_facility_orders_count(facility_name, filter_clauses, filter_params),
+                (page - 1) * page_size + len(rows) + has_next if rows else 0,
+            )
 
-            sql_params = {
-                'facility_name': facility_name,
-                'limit': page_size,
-                'offset': (page - 1) * page_size,
-                **filter_params
-            }
-            
-            rows = execute_raw_sql_readonly(sql, sql_params)
+            # Validate page bounds
+            total_pages = validator.validate_pagination_params(page_size, page, total_count)
 
             orders = []
+            status_name = OrderStatus.get_customer_status_name
             for row in rows:
                 order_id = row.get("id")
                 promotion_type = row.get('promotion_type', '')
@@ -608,7 +706,7 @@ class OrderQueryService:
                     "customer_name": row.get("customer_name"),
                     "facility_id": row.get("facility_id"),
                     "facility_name": row.get("facility_name"),
-                    "status": OrderStatus.get_customer_status_name(row.get("status")),
+                    "status": status_name(row.get("status")),
                     "total_amount": total_amount,
                     "eta": format_datetime_ist(row.get("eta")),
                     "created_at": format_datetime_ist(row.get("created_at")),
@@ -623,7 +721,7 @@ class OrderQueryService:
                     "page_size": page_size,
                     "total_count": total_count,
                     "total_pages": total_pages,
-                    "has_next": page < total_pages,
+                    "has_next": has_next,
                     "has_previous": page > 1
                 }
             }
@@ -635,17 +733,42 @@ class OrderQueryService:
             logger.error(f"facility_orders_fetch_error | facility_name={facility_name} error={e}", exc_info=True)
             raise HTTPException(status_code=500, detail="Failed to fetch facility orders")
 
-    def get_orders_by_customer_id(self, customer_id: str, page_size: int = 20, page: int = 1, sort_order: str = "desc", search: str = None) -> Dict:
-        return self.get_all_orders(customer_id, page_size, page, sort_order, search)
+    def get_orders_by_customer_id(self, customer_id: str, page_size: int = 20, page: int = 1, sort_order: str = "desc", search: str = None, cursor: str = None) -> Dict:
+        return self.get_all_orders(customer_id, page_size, page, sort_order, search, cursor=cursor)
+
+    def _build_order_items(self, rows: List[Dict]) -> List[Dict]:
+        """Shape order_items rows (selected with ORDER_ITEM_COLUMNS) for the API; amounts already arrive as floats"""
+        items = []
+        status_name = OrderStatus.get_customer_status_name
+        return_type_name = ReturnTypeConstants.get_description
+        for row in rows:
+            items.append({
+                "id": row["id"],
+                "order_id": row["order_id"],
+                "sku": row["sku"],
+                "name": row["name"],
+                "quantity": row["quantity"],
+                "pos_extra_quantity": row["pos_extra_quantity"],
+                "unit_price": row["unit_price"],
+                "sale_price": row["sale_price"],
+                "status": status_name(row["status"]),
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
+                "cgst": row["cgst"],
+                "sgst": row["sgst"],
+                "igst": row["igst"],
+                "cess": row["cess"],
+                "is_returnable": row["is_returnable"],
+                "return_type": return_type_name(row["return_type"]),
+                "return_window": row["return_window"],
+                "hsn_code": row["hsn_code"]  # HSN code from database
+            })
+        return items
 
     def get_order_items_by_customer_id(self, customer_id: str) -> List[Dict]:
         try:
-            sql = """
-                SELECT oi.id, oi.order_id, oi.sku, oi.name, oi.quantity, oi.pos_extra_quantity,
-                       oi.unit_price, oi.sale_price, oi.status,
-                       oi.cgst, oi.sgst, oi.igst, oi.cess, 
-                       oi.is_returnable, oi.return_type, oi.return_window,
-                       oi.created_at, oi.updated_at, oi.hsn_code
+            sql = f"""
+                SELECT {ORDER_ITEM_COLUMNS}
                 FROM order_items oi
                 JOIN orders o ON o.id = oi.order_id
                 WHERE o.customer_id = :customer_id
@@ -653,34 +776,7 @@ class OrderQueryService:
             """
 
             rows = execute_raw_sql_readonly(sql, {'customer_id': customer_id})
-
-            items = []
-            for row in rows:
-                return_type_description = self._get_return_type_description(row.get("return_type", "00"))
-
-                items.append({
-                    "id": row.get("id"),
-                    "order_id": row.get("order_id"),
-                    "sku": row.get("sku"),
-                    "name": row.get("name"),
-                    "quantity": row.get("quantity"),
-                    "pos_extra_quantity": float(row.get("pos_extra_quantity", 0)),
-                    "unit_price": float(row.get("unit_price", 0)),
-                    "sale_price": float(row.get("sale_price", 0)),
-                    "status": OrderStatus.get_customer_status_name(row.get("status")),
-                    "created_at": row.get("created_at"),
-                    "updated_at": row.get("updated_at"),
-                    "cgst": float(row.get("cgst", 0)),
-                    "sgst": float(row.get("sgst", 0)),
-                    "igst": float(row.get("igst", 0)),
-                    "cess": float(row.get("cess", 0)),
-                    "is_returnable": row.get("is_returnable", True),
-                    "return_type": return_type_description,
-                    "return_window": row.get("return_window", 7),
-                    "hsn_code": row.get("hsn_code", "")  # HSN code from database
-                })
-
-            return items
+            return self._build_order_items(rows)
 
         except Exception as e:
             logger.error(f"customer_order_items_fetch_error | customer_id={customer_id} error={e}", exc_info=True)
@@ -688,12 +784,8 @@ class OrderQueryService:
 
     def get_order_items_by_order_id(self, order_id: str) -> List[Dict]:
         try:
-            sql = """
-                SELECT oi.id, oi.order_id, oi.sku, oi.name, oi.quantity, oi.pos_extra_quantity,
-                       oi.unit_price, oi.sale_price, oi.status,
-                       oi.cgst, oi.sgst, oi.igst, oi.cess, 
-                       oi.is_returnable, oi.return_type, oi.return_window,
-                       oi.created_at, oi.updated_at, oi.hsn_code
+            sql = f"""
+                SELECT {ORDER_ITEM_COLUMNS}
                 FROM order_items oi
                 JOIN orders o ON o.id = oi.order_id
                 WHERE o.order_id = :order_id
@@ -701,34 +793,7 @@ class OrderQueryService:
             """
 
             rows = execute_raw_sql_readonly(sql, {'order_id': order_id})
-
-            items = []
-            for row in rows:
-                return_type_description = self._get_return_type_description(row.get("return_type", "00"))
-
-                items.append({
-                    "id": row.get("id"),
-                    "order_id": row.get("order_id"),
-                    "sku": row.get("sku"),
-                    "name": row.get("name"),
-                    "quantity": row.get("quantity"),
-                    "pos_extra_quantity": float(row.get("pos_extra_quantity", 0)),
-                    "unit_price": float(row.get("unit_price", 0)),
-                    "sale_price": float(row.get("sale_price", 0)),
-                    "status": OrderStatus.get_customer_status_name(row.get("status")),
-                    "created_at": row.get("created_at"),
-                    "updated_at": row.get("updated_at"),
-                    "cgst": float(row.get("cgst", 0)),
-                    "sgst": float(row.get("sgst", 0)),
-                    "igst": float(row.get("igst", 0)),
-                    "cess": float(row.get("cess", 0)),
-                    "is_returnable": row.get("is_returnable", True),
-                    "return_type": return_type_description,
-                    "return_window": row.get("return_window", 7),
-                    "hsn_code": row.get("hsn_code", "")  # HSN code from database
-                })
-
-            return items
+            return self._build_order_items(rows)
 
         except Exception as e:
             logger.error(f"order_items_fetch_error | order_id={order_id} error={e}", exc_info=True)
@@ -1,4 +1,5 @@
-from typing import Dict
+import asyncio
+from typing import Dict, List
 import random
 import string
 from app.utils.order_utils import get_utc
@@ -6,6 +7,7 @@ from sqlalchemy import text
 from app.core.constants import OrderStatus, SystemConstants
 from app.connections.database import get_raw_transaction
 from app.utils.datetime_helpers import format_datetime_ist
+from app.utils.order_list_cache import invalidate_order_list
 from app.dto.phone_validations import validate_phone_number
 from fastapi import HTTPException
 
@@ -19,19 +21,68 @@ logger = get_app_logger(__name__)
 from app.services.order_meta_service import OrderMetaService
 from app.utils.firebase_utils import get_customer_id_from_phone_number
 
+ORDER_PREFIX_CHARACTERS = string.ascii_uppercase + string.digits
+# Prefixes that would read like other order id schemes
+ORDER_PREFIX_BLOCKED_STARTS = ('ORD', 'POS', 'SAM', 'MN')
+
+
 def generate_random_prefix() -> str:
     """Generate a random 4-character alphanumeric string for order ID prefix.
 
     Returns:
         str: A 4-character string containing uppercase letters and digits (e.g., 'A2K4', '489K', 'X7B9')
     """
-    characters = string.ascii_uppercase + string.digits
     while True:
-        prefix = ''.join(random.choices(characters, k=4))
-        if not (prefix.upper().startswith(('ORD', 'POS', 'SAM', 'MN'))):
+        prefix = ''.join(random.choices(ORDER_PREFIX_CHARACTERS, k=4))
+        # Characters are already uppercase, so no case folding is needed before the check
+        if not prefix.startswith(ORDER_PREFIX_BLOCKED_STARTS):
             return prefix
 
 
+# Payment modes that leave a new order in DRAFT until the payment is confirmed, per origin
+ONLINE_PAYMENT_MODES_BY_ORIGIN = {
+    "app": frozenset({"razorpay", "online", "cashfree"}),
+    "pos": frozenset({"paytm_pos"}),
+}
+
+
+def build_item_params(item: Dict, order_pk: int, status: int) -> Dict:
+    """Bind parameters of one order_items INSERT row, with the defaults for optional item fields."""
+    return {
+        'order_id': order_pk,  # Use primary key, not order_id string
+        'sku': item['sku'],
+        'typesense_id': item.get('typesense_id') or '',  # Add typesense_id with empty string default
+        'name': item.get('name'),  # Optional name field
+        'quantity': item['quantity'],
+        'pos_extra_quantity': item.get('pos_extra_quantity', 0.0),
+        'unit_price': item['unit_price'],
+        'sale_price': item['sale_price'],
+        'original_sale_price': item.get('original_sale_price', item['sale_price']),  # Default to sale_price if not provided
+        'cgst': item.get('cgst', 0.0),
+        'sgst': item.get('sgst', 0.0),
+        'igst': item.get('igst', 0.0),
+        'cess': item.get('cess', 0.0),
+        'is_returnable': item.get('is_returnable', False),
+        'return_type': item.get('return_type', '00'),
+        'return_window': item.get('return_window', 0),
+        'selling_price_net': item.get('selling_price_net', 0.0),
+        'status': status,
+        'wh_sku': item.get('wh_sku', ''),
+        'pack_uom_quantity': item.get('pack_uom_quantity', 1),
+        'thumbnail_url': item.get('thumbnail_url', None),
+        'hsn_code': item.get('hsn_code', ''),  # HSN code from Typesense
+        'category': item.get('category', ''),
+        'sub_category': item.get('sub_category', ''),
+        'sub_sub_category': item.get('sub_sub_category', ''),
+        'brand_name': item.get('brand_name', ''),
+        'marketplace': item.get('marketplace', 'ROZANA'),
+        'referral_id': item.get('referral_id', ''),
+        'domain_name': item.get('domain_name', ''),
+        'provider_id': item.get('provider_id', ''),
+        'location_id': item.get('location_id', ''),
+    }
+
+
 class OrderService:
     """Service for handling order commands (Create, Update, Cancel) using SQLAlchemy raw SQL"""
 
@@ -39,11 +90,13 @@ class OrderService:
         # Set module name for contextual logging
         request_context.module_name = 'order_service'
 
-    async def get_initial_status(self, origin, payment_modes: list[str]):
+    @staticmethod
+    def get_initial_status(origin, payment_modes: list[str]):
         """Decide initial status based on origin and payment modes.
         If any online/razorpay is present → DRAFT, otherwise OPEN.
         """
-        if (origin == "app" and any(pm in ["razorpay", "online", "cashfree"] for pm in payment_modes)) or (origin == "pos" and any(pm in ["paytm_pos"] for pm in payment_modes)):
+        online_modes = ONLINE_PAYMENT_MODES_BY_ORIGIN.get(origin)
+        if online_modes and not online_modes.isdisjoint(payment_modes):
             return OrderStatus.DRAFT
 
         return OrderStatus.OPEN
@@ -73,7 +126,7 @@ class OrderService:
                 payment_modes = [p.get("payment_mode", "cod").lower() for p in order_data["payment"]]
             else:
                 payment_modes = [order_data.get("payment_mode", "cod").lower()]
-            initial_status = await self.get_initial_status(origin, payment_modes)
+            initial_status = self.get_initial_status(origin, payment_modes)
 
             # Generate random prefix for order_id prefix
             random_prefix = generate_random_prefix()
@@ -91,178 +144,11 @@ class OrderService:
             # Promotion
             promotion_details = order_data.get("promotion_result", {})
 
-            # Use SQLAlchemy transaction for atomic operation
-            with get_raw_transaction() as conn:
-                try:
-                    # Insert order with SQLAlchemy raw SQL - omit timestamp columns to use database defaults
-                    order_insert_sql = """
-                        INSERT INTO orders (
-                            random_prefix, customer_id, customer_name, 
-                            facility_id, facility_name, status, total_amount, eta,
-                            order_mode, is_approved, biller_id, biller_name, promotion_code, promotion_type, promotion_discount, user_type, marketplace, referral_id,
-                            domain_name, provider_id, location_id, delivery_charge, packaging_charge
-                        ) 
-                        VALUES (
-                            :random_prefix, :customer_id, :customer_name, 
-                            :facility_id, :facility_name, :status, :total_amount, :eta,
-                            :order_mode, :is_approved, :biller_id, :biller_name, :promotion_code, :promotion_type, :promotion_discount, :user_type, :marketplace, :referral_id,
-                            :domain_name, :provider_id, :location_id, :delivery_charge, :packaging_charge
-                        )
-                        RETURNING id, order_id, created_at
-                    """
-
-                    # Extract domain_name, provider_id, location_id from items, finding first non-empty values
-                    domain_name = provider_id = location_id = ''
-                    for item in order_data['items']:
-                        if item.get('domain_name'):
-                            domain_name = item.get('domain_name', '')
-                            provider_id = item.get('provider_id', '')
-                            location_id = item.get('location_id', '')
-                            break
-
-                    total_amount = float(order_data.get('original_total_amount', 0.0)) + order_data.get('delivery_charge', 0.0) + order_data.get('packaging_charge', 0.0)
-
-                    order_params = {
-                        'random_prefix': random_prefix,
-                        'customer_id': customer_id,
-                        'customer_name': customer_name,
-                        'facility_id': order_data['facility_id'],
-                        'facility_name': order_data['facility_name'],
-                        'status': initial_status,
-                        'total_amount': total_amount,
-                        'eta': eta,
-                        'order_mode': origin,
-                        'is_approved': order_data.get('is_approved', False),
-                        'biller_id': biller_id,
-                        'biller_name': biller_name,
-                        'promotion_code': promotion_details.get('promotion_code', ''),
-                        'promotion_type': promotion_details.get('promotion_type', ''),
-                        'promotion_discount': promotion_details.get('promotion_discount', 0.0),
-                        'user_type': order_data.get('user_type', 'customer'),
-                        'marketplace': order_data.get('marketplace', 'ROZANA'),
-                        'referral_id': order_data.get('referral_id', ''),
-                        'domain_name': domain_name,
-                        'provider_id': provider_id,
-                        'location_id': location_id,
-                        'delivery_charge': order_data.get('delivery_charge', 0.0),
-                        'packaging_charge': order_data.get('packaging_charge', 0.0),
-                    }
-
-                    result = conn.execute(text(order_insert_sql), order_params)
-                    order_row = result.fetchone()
-
-                    if not order_row:
-                        raise Exception("Failed to create order")
-
-                    order_internal_id = order_row.id
-                    generated_order_id = order_row.order_id
-                    created_at = order_row.created_at
-
-                    logger.info(f"order_row_created | id={order_internal_id} order_id={generated_order_id}")
-
-                    # Insert order items with corrected foreign key reference (orders.id)
-                    if 'items' in order_data and order_data['items']:
-                        for item in order_data['items']:
-                            item_insert_sql = """
-                                INSERT INTO order_items (
-                                    order_id, sku, typesense_id, name, quantity, pos_extra_quantity, unit_price, sale_price, original_sale_price, status,
-                                    cgst, sgst, igst, cess, is_returnable, return_type, return_window, selling_price_net, wh_sku, pack_uom_quantity, thumbnail_url, hsn_code,
-                                    category, sub_category, sub_sub_category, brand_name, marketplace, referral_id,
-                                    domain_name, provider_id, location_id
-                                ) VALUES (
-                                    :order_id, :sku, :typesense_id, :name, :quantity, :pos_extra_quantity, :unit_price, :sale_price, :original_sale_price, :status,
-                                    :cgst, :sgst, :igst, :cess, :is_returnable, :return_type, :return_window, :selling_price_net, :wh_sku, :pack_uom_quantity, :thumbnail_url, :hsn_code,
-                                    :category, :sub_category, :sub_sub_category, :brand_name, :marketplace, :referral_id,
-                                    :domain_name, :provider_id, :location_id
-                                )
-                            """
-
-                            item_params = {
-                                'order_id': order_internal_id,  # Use primary key, not order_id string
-                                'sku': item['sku'],
-                                'typesense_id': item.get('typesense_id') or '',  # Add typesense_id with empty string default
-                                'name': item.get('name'),  # Optional name field
-                                'quantity': item['quantity'],
-                                'pos_extra_quantity': item.get('pos_extra_quantity', 0.0),
-                                'unit_price': item['unit_price'],
-                                'sale_price': item['sale_price'],
-                                'original_sale_price': item.get('original_sale_price', item['sale_price']),  # Default to sale_price if not provided
-                                'cgst': item.get('cgst', 0.0),
-                                'sgst': item.get('sgst', 0.0),
-                                'igst': item.get('igst', 0.0),
-                                'cess': item.get('cess', 0.0),
-                                'is_returnable': item.get('is_returnable', False),
-                                'return_type': item.get('return_type', '00'),
-                                'return_window': item.get('return_window', 0),
-                                'selling_price_net': item.get('selling_price_net', 0.0),
-                                'status': initial_status,
-                                'wh_sku': item.get('wh_sku', ''),
-                                'pack_uom_quantity': item.get('pack_uom_quantity', 1),
-                                'thumbnail_url': item.get('thumbnail_url', None),
-                                'hsn_code': item.get('hsn_code', ''),  # HSN code from Typesense
-                                'category': item.get('category', ''),
-                                'sub_category': item.get('sub_category', ''),
-                                'sub_sub_category': item.get('sub_sub_category', ''),
-                                'brand_name': item.get('brand_name', ''),
-                                'marketplace': item.get('marketplace', 'ROZANA'),
-                                'referral_id': item.get('referral_id', ''),
-                                'domain_name': item.get('domain_name', ''),
-                                'provider_id': item.get('provider_id', ''),
-                                'location_id': item.get('location_id', ''),
-                            }
-
-                            conn.execute(text(item_insert_sql), item_params)
-
-                    # Insert order address with corrected foreign key reference (orders.id)
-                    if 'address' in order_data and order_data['address']:
-                        address = order_data['address']
-                        address_insert_sql = """
-                            INSERT INTO order_addresses (
-                                order_id, full_name, phone_number, address_line1, address_line2,
-                                city, state, postal_code, country, type_of_address, longitude, latitude
-                            ) VALUES (
-                                :order_id, :full_name, :phone_number, :address_line1, :address_line2,
-                                :city, :state, :postal_code, :country, :type_of_address, :longitude, :latitude
-                            )
-                        """
-
-                        address_params = {
-                            'order_id': order_internal_id,  # Use primary key, not order_id string
-                            'full_name': address['full_name'],
-                            'phone_number': address['phone_number'],
-                            'address_line1': address['address_line1'],
-                            'address_line2': address.get('address_line2'),
-                            'city': address['city'],
-                            'state': address['state'],
-                            'postal_code': address['postal_code'],
-                            'country': address['country'],
-                            'type_of_address': address.get('type_of_address', 'delivery'),
-                            'longitude': address.get('longitude'),
-                            'latitude': address.get('latitude')
-                        }
-                        
-                        conn.execute(text(address_insert_sql), address_params)
-
-                    # Commit transaction
-                    conn.commit()
-                    logger.info(f"order_create_success | order_id={generated_order_id} id={order_internal_id}")
-
-                    return {
-                        "success": True,
-                        "message": f"Order {generated_order_id} created successfully",
-                        "order_id": generated_order_id,
-                        "id": order_internal_id,  # ← Add this line!
-                        "eta": format_datetime_ist(eta),
-                        "created_at": created_at
-                    }
-
-                except Exception as db_error:
-                    conn.rollback()
-                    logger.error(f"order_create_db_error | error={db_error}", exc_info=True)
-                    return {
-                        "success": False,
-                        "message": f"Database error: {str(db_error)}"
-                    }
+            # The inserts are blocking; run them off the event loop
+            return await asyncio.to_thread(
+                self._insert_order, order_data, origin, customer_id, customer_name, initial_status,
+                eta, random_prefix, biller_id, biller_name, promotion_details
+            )
 
         except ValueError as validation_error:
             logger.warning(f"order_create_validation_error | error={validation_error}")
@@ -279,7 +165,160 @@ class OrderService:
                 "message": f"Unexpected error: {str(exc)}"
             }
 
+    def _insert_order(self, order_data: Dict, origin: str, customer_id: str, customer_name: str, initial_status: int,
+                      eta, random_prefix: str, biller_id: str, biller_name: str, promotion_details: Dict) -> Dict:
+        """Insert the order, its items and its address in one transaction; returns the create_order result"""
+
+        # Use SQLAlchemy transaction for atomic operation
+        with get_raw_transaction() as conn:
+            try:
+                # Insert order with SQLAlchemy raw SQL - omit timestamp columns to use database defaults
+                order_insert_sql = """
+                    INSERT INTO orders (
+                        random_prefix, customer_id, customer_name, 
+                        facility_id, facility_name, status, total_amount, eta,
+                        order_mode, is_approved, biller_id, biller_name, promotion_code, promotion_type, promotion_discount, user_type, marketplace, referral_id,
+                        domain_name, provider_id, location_id, delivery_charge, packaging_charge
+                    ) 
+                    VALUES (
+                        :random_prefix, :customer_id, :customer_name, 
+                        :facility_id, :facility_name, :status,
+                        CAST(:original_total_amount AS NUMERIC) + CAST(:delivery_charge AS NUMERIC) + CAST(:packaging_charge AS NUMERIC), :eta,
+                        :order_mode, :is_approved, :biller_id, :biller_name, :promotion_code, :promotion_type, :promotion_discount, :user_type, :marketplace, :referral_id,
+                        :domain_name, :provider_id, :location_id, :delivery_charge, :packaging_charge
+                    )
+                    RETURNING id, order_id, created_at
+                """
+
+                # Extract domain_name, provider_id, location_id from the first item that has a domain_name
+                domain_item = next((item for item in order_data['items'] if item.get('domain_name')), None)
+                if domain_item:
+                    domain_name = domain_item['domain_name']
+                    provider_id = domain_item.get('provider_id', '')
+                    location_id = domain_item.get('location_id', '')
+                else:
+                    domain_name = provider_id = location_id = ''
+
+                order_params = {
+                    'random_prefix': random_prefix,
+                    'customer_id': customer_id,
+                    'customer_name': customer_name,
+                    'facility_id': order_data['facility_id'],
+                    'facility_name': order_data['facility_name'],
+                    'status': initial_status,
+                    # total_amount = original total + charges, summed as NUMERIC in the INSERT
+                    'original_total_amount': order_data.get('original_total_amount', 0.0),
+                    'eta': eta,
+                    'order_mode': origin,
+                    'is_approved': order_data.get('is_approved', False),
+                    'biller_id': biller_id,
+                    'biller_name': biller_name,
+                    'promotion_code': promotion_details.get('promotion_code', ''),
+                    'promotion_type': promotion_details.get('promotion_type', ''),
+                    'promotion_discount': promotion_details.get('promotion_discount', 0.0),
+                    'user_type': order_data.get('user_type', 'customer'),
+                    'marketplace': order_data.get('marketplace', 'ROZANA'),
+                    'referral_id': order_data.get('referral_id', ''),
+                    'domain_name': domain_name,
+                    'provider_id': provider_id,
+                    'location_id': location_id,
+                    'delivery_charge': order_data.get('delivery_charge', 0.0),
+                    'packaging_charge': order_data.get('packaging_charge', 0.0),
+                }
+
+                # Insert order address with corrected foreign key reference (orders.id), in the same statement as the order row
+                if 'address' in order_data and order_data['address']:
+                    address = order_data['address']
+                    order_insert_sql = f"""
+                        WITH new_order AS ({order_insert_sql}),
+                        new_address AS (
+                            INSERT INTO order_addresses (
+                                order_id, full_name, phone_number, address_line1, address_line2,
+                                city, state, postal_code, country, type_of_address, longitude, latitude
+                            )
+                            SELECT id, :full_name, :phone_number, :address_line1, :address_line2,
+                                   :city, :state, :postal_code, :country, :type_of_address,
+                                   CAST(:longitude AS NUMERIC), CAST(:latitude AS NUMERIC)
+                            FROM new_order
+                        )
+                        SELECT id, order_id, created_at FROM new_order
+                    """
+
+                    order_params.update({
+                        'full_name': address['full_name'],
+                        'phone_number': address['phone_number'],
+                        'address_line1': address['address_line1'],
+                        'address_line2': address.get('address_line2'),
+                        'city': address['city'],
+                        'state': address['state'],
+                        'postal_code': address['postal_code'],
+                        'country': address['country'],
+                        'type_of_address': address.get('type_of_address', 'delivery'),
+                        'longitude': address.get('longitude'),
+                        'latitude': address.get('latitude')
+                    })
+
+                result = conn.execute(text(order_insert_sql), order_params)
+                order_row = result.fetchone()
+
+                if not order_row:
+                    raise Exception("Failed to create order")
+
+                order_internal_id = order_row.id
+                generated_order_id = order_row.order_id
+                created_at = order_row.created_at
+
+                logger.info(f"order_row_created | id={order_internal_id} order_id={generated_order_id}")
+
+                # Insert order items with corrected foreign key reference (orders.id)
+                if 'items' in order_data and order_data['items']:
+                    item_insert_sql = """
+                        INSERT INTO order_items (
+                            order_id, sku, typesense_id, name, quantity, pos_extra_quantity, unit_price, sale_price, original_sale_price, status,
+                            cgst, sgst, igst, cess, is_returnable, return_type, return_window, selling_price_net, wh_sku, pack_uom_quantity, thumbnail_url, hsn_code,
+                            category, sub_category, sub_sub_category, brand_name, marketplace, referral_id,
+                            domain_name, provider_id, location_id
+                        ) VALUES (
+                            :order_id, :sku, :typesense_id, :name, :quantity, :pos_extra_quantity, :unit_price, :sale_price, :original_sale_price, :status,
+                            :cgst, :sgst, :igst, :cess, :is_returnable, :return_type, :return_window, :selling_price_net, :wh_sku, :pack_uom_quantity, :thumbnail_url, :hsn_code,
+                            :category, :sub_category, :sub_sub_category, :brand_name, :marketplace, :referral_id,
+                            :domain_name, :provider_id, :location_id
+                        )
+                    """
+
+                    # One executemany for all items instead of a round trip per item
+                    item_params = [build_item_params(item, order_internal_id, initial_status) for item in order_data['items']]
+
+                    conn.execute(text(item_insert_sql), item_params)
+
+                # Commit transaction
+                conn.commit()
+                logger.info(f"order_create_success | order_id={generated_order_id} id={order_internal_id}")
+                invalidate_order_list(customer_id)
+
+                return {
+                    "success": True,
+                    "message": f"Order {generated_order_id} created successfully",
+                    "order_id": generated_order_id,
+                    "id": order_internal_id,  # ← Add this line!
+                    "eta": format_datetime_ist(eta),
+                    "created_at": created_at
+                }
+
+            except Exception as db_error:
+                conn.rollback()
+                logger.error(f"order_create_db_error | error={db_error}", exc_info=True)
+                return {
+                    "success": False,
+                    "message": f"Database error: {str(db_error)}"
+                }
+
+
     async def update_order_status(self, order_id: str, status) -> Dict:
+        # Blocking database work; run it off the event loop
+        return await asyncio.to_thread(self._update_order_status, order_id, status)
+
+    def _update_order_status(self, order_id: str, status) -> Dict:
         """Update order status in both orders and order_items tables using SQLAlchemy"""
 
         try:
@@ -289,6 +328,7 @@ class OrderService:
                     UPDATE orders 
                     SET status = :status, updated_at = NOW() 
                     WHERE order_id = :order_id
+                    RETURNING id, customer_id
                 """
 
                 # Handle both integer constants and string statuses
@@ -315,38 +355,33 @@ class OrderService:
                         "message": f"Invalid status type: {type(status)}"
                     }
 
-                result = conn.execute(text(update_order_sql), {
+                order_row = conn.execute(text(update_order_sql), {
                     'status': status_value,
                     'order_id': order_id
-                })
+                }).fetchone()
 
-                if result.rowcount == 0:
+                if not order_row:
                     logger.warning(f"order_status_update_not_found | order_id={order_id}")
                     return {
                         "success": False,
                         "message": f"Order {order_id} not found"
                     }
 
-                # Get the primary key for updating items
-                get_order_id_sql = "SELECT id FROM orders WHERE order_id = :order_id"
-                order_result = conn.execute(text(get_order_id_sql), {'order_id': order_id})
-                order_row = order_result.fetchone()
-
-                if order_row:
-                    # Update all items status using primary key
-                    update_items_sql = """
-                        UPDATE order_items 
-                        SET status = :status 
-                        WHERE order_id = :order_pk
-                    """
+                # Update all items status using the primary key returned above
+                update_items_sql = """
+                    UPDATE order_items 
+                    SET status = :status 
+                    WHERE order_id = :order_pk
+                """
 
-                    conn.execute(text(update_items_sql), {
-                        'status': status,
-                        'order_pk': order_row.id
-                    })
+                conn.execute(text(update_items_sql), {
+                    'status': status_value,
+                    'order_pk': order_row.id
+                })
 
                 conn.commit()
                 logger.info(f"order_status_updated | order_id={order_id} status={status}")
+                invalidate_order_list(order_row.customer_id)
 
                 return {
                     "success": True,
@@ -360,56 +395,100 @@ class OrderService:
                 "message": f"Failed to update order status: {str(e)}"
             }
 
-    async def update_item_status(self, order_id: str, sku: str, status: str) -> Dict:
-        """Update status of a specific item within an order using SQLAlchemy"""
+    async def update_order_statuses(self, order_ids: List[str], status: int) -> Dict:
+        # Blocking database work; run it off the event loop
+        return await asyncio.to_thread(self._update_order_statuses, order_ids, status)
+
+    def _update_order_statuses(self, order_ids: List[str], status: int) -> Dict:
+        """Update status of several orders and their items in one transaction"""
+
+        if not order_ids:
+            return {"success": True, "updated_order_ids": []}
 
         try:
             with get_raw_transaction() as conn:
-                # Get order primary key
-                get_order_sql = "SELECT id FROM orders WHERE order_id = :order_id"
-                order_result = conn.execute(text(get_order_sql), {'order_id': order_id})
-                order_row = order_result.fetchone()
+                update_orders_sql = """
+                    UPDATE orders
+                    SET status = :status, updated_at = NOW()
+                    WHERE order_id = ANY(:order_ids)
+                    RETURNING id, order_id, customer_id
+                """
+                updated_rows = conn.execute(text(update_orders_sql), {
+                    'status': status,
+                    'order_ids': list(order_ids)
+                }).fetchall()
 
-                if not order_row:
-                    logger.warning(f"order_item_status_update_order_not_found | order_id={order_id}")
-                    return {
-                        "success": False,
-                        "message": "Order not found"
-                    }
+                if updated_rows:
+                    update_items_sql = """
+                        UPDATE order_items
+                        SET status = :status
+                        WHERE order_id = ANY(:order_pks)
+                    """
+                    conn.execute(text(update_items_sql), {
+                        'status': status,
+                        'order_pks': [row.id for row in updated_rows]
+                    })
+
+                conn.commit()
+
+            updated_order_ids = [row.order_id for row in updated_rows]
+            missing = set(order_ids) - set(updated_order_ids)
+            if missing:
+                logger.warning(f"order_status_bulk_update_not_found | order_ids={sorted(missing)}")
+            logger.info(f"order_status_bulk_updated | order_ids={updated_order_ids} status={status}")
+            invalidate_order_list(*{row.customer_id for row in updated_rows})
 
-                order_pk = order_row.id
+            return {
+                "success": True,
+                "updated_order_ids": updated_order_ids
+            }
+
+        except Exception as e:
+            logger.error(f"order_status_bulk_update_error | order_ids={order_ids} error={e}", exc_info=True)
+            return {
+                "success": False,
+                "message": f"Failed to update order statuses: {str(e)}"
+            }
 
-                # Check if item exists in the order (using primary key)
-                check_item_sql = """
-                    SELECT id FROM order_items
-                    WHERE order_id = :order_pk AND sku = :sku
+    async def update_item_status(self, order_id: str, sku: str, status: str) -> Dict:
+        # Blocking database work; run it off the event loop
+        return await asyncio.to_thread(self._update_item_status, order_id, sku, status)
+
+    def _update_item_status(self, order_id: str, sku: str, status: str) -> Dict:
+        """Update status of a specific item within an order using SQLAlchemy"""
+
+        try:
+            with get_raw_transaction() as conn:
+                # Update specific item status, resolving the order primary key in the same statement
+                update_item_sql = """
+                    UPDATE order_items oi
+                    SET status = :status, updated_at = NOW()
+                    FROM orders o
+                    WHERE oi.order_id = o.id AND o.order_id = :order_id AND oi.sku = :sku
+                    RETURNING oi.order_id
                 """
 
-                item_result = conn.execute(text(check_item_sql), {
-                    'order_pk': order_pk,
+                item_row = conn.execute(text(update_item_sql), {
+                    'status': status,
+                    'order_id': order_id,
                     'sku': sku
-                })
+                }).fetchone()
 
-                if not item_result.fetchone():
+                if not item_row:
+                    # Nothing updated: tell a missing order apart from a missing item
+                    get_order_sql = "SELECT id FROM orders WHERE order_id = :order_id"
+                    if not conn.execute(text(get_order_sql), {'order_id': order_id}).fetchone():
+                        logger.warning(f"order_item_status_update_order_not_found | order_id={order_id}")
+                        return {
+                            "success": False,
+                            "message": "Order not found"
+                        }
                     logger.warning(f"order_item_status_update_item_not_found | order_id={order_id} sku={sku}")
                     return {
                         "success": False,
                         "message": f"Item with SKU '{sku}' not found in order '{order_id}'"
                     }
 
-                # Update specific item status
-                update_item_sql = """
-                    UPDATE order_items
-                    SET status = :status, updated_at = NOW()
-                    WHERE order_id = :order_pk AND sku = :sku
-                """
-                
-                conn.execute(text(update_item_sql), {
-                    'status': status,
-                    'order_pk': order_pk,
-                    'sku': sku
-                })
-
                 conn.commit()
                 logger.info(f"order_item_status_updated | order_id={order_id} sku={sku} status={status}")
                 return {
@@ -427,6 +506,10 @@ class OrderService:
             }
 
     async def get_facility_name(self, order_id: str) -> Dict:
+        # Blocking database work; run it off the event loop
+        return await asyncio.to_thread(self._get_facility_name, order_id)
+
+    def _get_facility_name(self, order_id: str) -> Dict:
         try:
             with get_raw_transaction() as conn:
                 get_facility_name_sql = "SELECT facility_name FROM orders WHERE order_id = :order_id"
@@ -445,22 +528,16 @@ class OrderService:
         """
         try:
             with get_raw_transaction() as conn:
-                # Get internal PK for the order
-                get_pk_sql = "SELECT id FROM orders WHERE order_id = :order_id"
-                order_result = conn.execute(text(get_pk_sql), {'order_id': order_id})
-                order_row = order_result.fetchone()
-                if not order_row:
-                    return []
-
-                # Fetch delivered items
+                # Fetch delivered items, joining orders for the internal PK
                 get_items_sql = (
-                    "SELECT sku, quantity, fulfilled_quantity FROM order_items "
-                    "WHERE order_id = :order_pk AND status = :delivered"
+                    "SELECT oi.sku, oi.quantity, oi.fulfilled_quantity FROM order_items oi "
+                    "JOIN orders o ON o.id = oi.order_id "
+                    "WHERE o.order_id = :order_id AND oi.status = :delivered"
                 )
                 items_result = conn.execute(
                     text(get_items_sql),
                     {
-                        'order_pk': order_row.id,
+                        'order_id': order_id,
                         'delivered': OrderStatus.TMS_DELIVERED,
                     },
                 )
@@ -9,12 +9,17 @@ from app.repository.payments import PaymentRepository
 # Constants
 from app.core.constants import PaymentStatus
 
+import asyncio
 import json
+from typing import Dict, List, Tuple
 
 # Logger
 from app.logging.utils import get_app_logger
 logger = get_app_logger("order_payment_processor")
 
+# Payment modes settled by a gateway webhook (razorpay/cashfree)
+GATEWAY_PAYMENT_MODES = frozenset(("razorpay", "cashfree"))
+
 class OrderPaymentProcessor:
     def __init__(self):
         pass
@@ -80,21 +85,55 @@ class OrderPaymentProcessor:
             return False, sync_order
 
     async def process_razorpay_included_order_payment(self, order_id: str, payment_records = [], razorpay_payment_id: str = None, razorpay_status: int = None):
+        """Single-order form of process_gateway_orders_batch; returns (payments_status, sync_order)."""
+        results = await self.process_gateway_orders_batch([(order_id, payment_records)], razorpay_payment_id, razorpay_status)
+        return results.get(order_id, (False, False))
 
-        # if the payment mode is razorpay then update the payment status as completed
-        # if the payment mode is razorpay and cash/online then update the payment status as completed
-        # if the payment mode is razorpay and wallet debit the amount from wallet and make the status as completed
-        # Three Combinations
-        # 1. razorpay + cash/online + wallet - debit the amount from wallet and make the status as completed
+    async def process_gateway_orders_batch(self, orders: List[Tuple[str, List[Dict]]], gateway_payment_id: str, gateway_status: int) -> Dict[str, Tuple[bool, bool]]:
+        """
+        Apply one gateway (razorpay/cashfree) payment event to all orders it paid for.
 
-        sync_order = False
-        # sort the payment records based on the payment mode # to be checked
+        The gateway records of every order get the gateway payment id and status in a single UPDATE.
+        Orders whose gateway payment succeeded then settle their wallet and cash/online records
+        one order at a time, so wallet debits of a customer never run concurrently.
+        Returns {order_id: (payments_status, sync_order)}.
+        """
+        results: Dict[str, Tuple[bool, bool]] = {}
+        gateway_records_by_order = {
+            order_id: [r for r in records if (r.get("payment_mode") or "").lower() in GATEWAY_PAYMENT_MODES]
+            for order_id, records in orders
+        }
+        gateway_record_ids = [r.get("id") for records in gateway_records_by_order.values() for r in records]
+
+        try:
+            payment_repo = PaymentRepository()
+            updated_ids = set(await asyncio.to_thread(payment_repo.update_gateway_payments, gateway_record_ids, str(gateway_payment_id), gateway_status))
+        except Exception as e:
+            logger.error(f"Gateway payment status update failed: payment_id={gateway_payment_id} error={str(e)}")
+            return {order_id: (False, False) for order_id, _ in orders}
+
+        settle_orders = []
+        for order_id, records in orders:
+            gateway_records = gateway_records_by_order[order_id]
+            if any(r.get("id") not in updated_ids for r in gateway_records):
+                logger.error(f"Gateway payment status update failed: order_id={order_id} payment_id={gateway_payment_id}")
+                results[order_id] = (False, False)
+            elif gateway_records and gateway_status == PaymentStatus.FAILED:
+                logger.warning(f"Gateway payment failed: order_id={order_id} payment_id={gateway_payment_id}")
+                results[order_id] = (False, False)
+            else:
+                settle_orders.append((order_id, [r for r in records if r not in gateway_records]))
+
+        for order_id, records in settle_orders:
+            ok = await self._settle_wallet_and_cash_payments(order_id, records)
+            results[order_id] = (ok, ok)
+        return results
 
+    async def _settle_wallet_and_cash_payments(self, order_id: str, payment_records: List[Dict]) -> bool:
+        """Debit wallet records, then mark cash/online records completed; stops at the first failure."""
         try:
             description = "Payment for order " + order_id
-            
-            # Sort payments: gateway (razorpay/cashfree) (0), wallet (1), cash/online (2)
-            payment_records = sorted(payment_records, key=lambda p: (0 if p.get('payment_mode', '').lower() in ['razorpay', 'cashfree'] else (1 if p.get('payment_mode', '').lower() == 'wallet' else 2)))
+            payment_records = sorted(payment_records, key=lambda p: 0 if (p.get('payment_mode') or '').lower() == 'wallet' else 1)
 
             for payment_record in payment_records:
                 if payment_record.get("payment_mode", "").lower() == "wallet":
@@ -112,7 +151,7 @@ class OrderPaymentProcessor:
                     logger.info(f"Wallet payment processed successfully: {payment_id}")
                     if not wallet_result.get("success", False):
                         logger.error(f"Wallet payment failed: {json.dumps(wallet_result)}")
-                        return False, sync_order
+                        return False
 
                 elif payment_record.get("payment_mode", "").lower() in {"cash", "online"}:
                     payment_id = payment_record.get("payment_id")
@@ -124,62 +163,13 @@ class OrderPaymentProcessor:
                     logger.info(f"Cash-like payment processed successfully: {payment_id}")
                     if not cash_result.get("success", False):
                         logger.error(f"Cash-like payment failed: {json.dumps(cash_result)}")
-                        return False, sync_order
-
-                elif payment_record.get("payment_mode", "").lower() == "razorpay":
-                    payment_id = razorpay_payment_id
-                    payment_internal_id = payment_record.get("id")
-                    # update the payment_id in the payment_details table
-                    payment_repo = PaymentRepository()
-                    payment_repo.upadate_the_razorpay_payment_id(payment_internal_id, payment_id)
-                    payment_service = PaymentService()
-                    razorpay_result = await payment_service.update_payment_status(
-                        payment_id=payment_id,
-                        new_status=razorpay_status
-                    )
-                    logger.info(f"Razorpay payment processed successfully: {payment_id}")
-                    if not razorpay_result.get("success", False):
-                        logger.error(f"Razorpay payment status update failed: {json.dumps(razorpay_result)}")
-                        sync_order = False
-                        break
-                    elif razorpay_status == 52:
-                        logger.warning(f"Razorpay payment failed: {json.dumps(razorpay_result)}")
-                        sync_order = False
-                        break
-
-                elif payment_record.get("payment_mode", "").lower() == "cashfree":
-                    payment_id = str(razorpay_payment_id)  # Use same payment_id parameter for Cashfree
-                    payment_internal_id = payment_record.get("id")
-                    payment_mode_name = payment_record.get("payment_mode", "").lower()
-                    # update the payment_id in the payment_details table
-                    payment_repo = PaymentRepository()
-                    payment_repo.upadate_the_razorpay_payment_id(payment_internal_id, payment_id)
-                    payment_service = PaymentService()
-                    cashfree_result = await payment_service.update_payment_status(
-                        payment_id=payment_id,
-                        new_status=razorpay_status
-                    )
-                    logger.info(f"{payment_mode_name.capitalize()} payment processed successfully: {payment_id}")
-                    if not cashfree_result.get("success", False):
-                        logger.error(f"{payment_mode_name.capitalize()} payment status update failed: {json.dumps(cashfree_result)}")
-                        sync_order = False
-                        break
-                    elif razorpay_status == 52:
-                        logger.warning(f"{payment_mode_name.capitalize()} payment failed: {json.dumps(cashfree_result)}")
-                        sync_order = False
-                        break
-
-            else:
-                # loop didnt break, so all payments processed successfully
-                sync_order = True
-                return True, sync_order
+                        return False
 
-            # If we broke out of the loop due to a failure, return failure and don't sync
-            return False, sync_order
+            return True
 
         except Exception as e:
             logger.error(f"Error processing order payment: {str(e)}")
-            return False, sync_order
+            return False
 
     async def process_paytm_pos_included_order_payment(self, order_id: str, payment_records = [], paytm_txn_id: str = None, paytm_status: int = None):
         """
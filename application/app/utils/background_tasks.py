@@ -0,0 +1,38 @@
+"""
+Utilities for running coroutines detached from the request lifecycle.
+"""
+
+import asyncio
+from typing import Any, Coroutine, Set
+
+from app.logging.utils import get_app_logger
+logger = get_app_logger("background_tasks")
+
+# Strong references to in-flight tasks; the event loop only keeps weak ones
+_detached_tasks: Set[asyncio.Task] = set()
+
+
+def _on_detached_task_done(task: asyncio.Task) -> None:
+    _detached_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.error(f"detached_task_failed | task={task.get_name()} error={exc}", exc_info=exc)
+
+
+def run_detached(coro: Coroutine[Any, Any, Any], name: str = None) -> asyncio.Task:
+    """
+    Schedule a coroutine on the running loop without tying it to the current request.
+
+    Args:
+        coro: Coroutine to run
+        name: Optional task name used in failure logs
+
+    Returns:
+        The scheduled asyncio.Task
+    """
+    task = asyncio.create_task(coro, name=name)
+    _detached_tasks.add(task)
+    task.add_done_callback(_on_detached_task_done)
+    return task
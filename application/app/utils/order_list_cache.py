@@ -0,0 +1,67 @@
+"""Short-lived Redis cache for a customer's order list pages, dropped whenever the customer's orders change."""
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.connections.redis_wrapper import get_cache_client
+from app.config.settings import OMSConfigs
+from app.logging.utils import get_app_logger
+
+configs = OMSConfigs()
+logger = get_app_logger("order_list_cache")
+
+CACHE_ENABLED = configs.ORDER_LIST_CACHE_ENABLED
+CACHE_TTL = configs.ORDER_LIST_CACHE_TTL_SECONDS
+CACHE_PREFIX = configs.ORDER_LIST_CACHE_PREFIX
+
+def build_cache_key(customer_id: str) -> str:
+    # One hash per customer, one field per page query, so a single DEL invalidates every page
+    return f"{CACHE_PREFIX}:{customer_id}"
+
+
+def _cache_field(list_params: Tuple) -> str:
+    return json.dumps(list(list_params))
+
+
+def get_cached_order_list(customer_id: str, list_params: Tuple) -> Optional[Dict[str, Any]]:
+    if not CACHE_ENABLED or not customer_id:
+        return None
+    try:
+        redis_client = get_cache_client()
+        cached = redis_client.hget(build_cache_key(customer_id), _cache_field(list_params)) if redis_client else None
+    except Exception as exc:
+        logger.warning(f"order_list_cache_get_error | customer_id={customer_id} error={exc}")
+        return None
+    # The hash expiry is re-armed by every page write, so each page also carries its own deadline
+    if cached and cached.get("expires_at", 0) > time.time():
+        return cached.get("result")
+    return None
+
+
+def cache_order_list(customer_id: str, list_params: Tuple, result: Dict[str, Any]) -> None:
+    if not CACHE_ENABLED or CACHE_TTL <= 0 or not customer_id:
+        return
+    try:
+        redis_client = get_cache_client()
+        if redis_client:
+            entry = {"expires_at": time.time() + CACHE_TTL, "result": result}
+            redis_client.hset_with_ttl(build_cache_key(customer_id), _cache_field(list_params), entry, CACHE_TTL)
+    except Exception as exc:
+        logger.warning(f"order_list_cache_set_error | customer_id={customer_id} error={exc}")
+
+
+def invalidate_order_list(*customer_ids: str) -> None:
+    """Drop every cached list page of the given customers; call after the write commits."""
+    if not CACHE_ENABLED:
+        return
+    cache_keys = {build_cache_key(customer_id) for customer_id in customer_ids if customer_id}
+    if not cache_keys:
+        return
+    try:
+        redis_client = get_cache_client()
+        if redis_client:
+            redis_client.delete_many(cache_keys)
+    except Exception as exc:
+        logger.warning(f"order_list_cache_invalidate_error | customer_ids={list(customer_ids)} error={exc}")
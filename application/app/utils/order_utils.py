@@ -1,3 +1,6 @@
+import base64
+from typing import Tuple
+
 from app.core.constants import OrderStatus
 from app.validations.stock import StockValidator
 from app.services.typesense_service import TypesenseService
@@ -197,4 +200,19 @@ async def block_quantity_in_typesense(bulk_update_data, facility_name):
             logger.error(f"Failed to bulk update documents in Typesense: {str(e)}")
             raise
     else:
-        logger.warning("No documents to update in Typesense")
\ No newline at end of file
+        logger.warning("No documents to update in Typesense")
+
+
+def encode_order_cursor(created_at: datetime, order_pk: int) -> str:
+    """Opaque keyset cursor pointing just past the order with this (created_at, id)."""
+    raw = f"{created_at.isoformat()}|{order_pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_order_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_order_cursor; raises ValueError for a malformed cursor."""
+    try:
+        created_at, order_pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(order_pk)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,146 @@
+"""
+Helpers shared by the payment gateway webhook routes.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from fastapi import BackgroundTasks, HTTPException
+
+from app.core.constants import OrderStatus, PaymentStatus, PaymentGatewayConstants
+from app.repository.payments import PaymentRepository
+from app.services.payments.payment_processor import OrderPaymentProcessor
+from app.services.order_service import OrderService
+from app.integrations.potions_service import PotionsService
+
+from app.logging.utils import get_app_logger
+logger = get_app_logger("webhook_utils")
+
+# Stateless collaborators shared across webhook calls
+payment_repository = PaymentRepository()
+payment_processor = OrderPaymentProcessor()
+
+
+def parse_webhook_body(raw_body: bytes) -> Dict[str, Any]:
+    """
+    Parse a verified webhook body into a dict.
+
+    json.loads reads the UTF-8 bytes directly, so the body is never decoded to str first.
+
+    Raises:
+        HTTPException: 400 if the body is not a JSON object
+    """
+    try:
+        webhook_data = json.loads(raw_body)
+    except ValueError:
+        logger.error("webhook_invalid_json | reason=decode_error")
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    if not isinstance(webhook_data, dict):
+        logger.error("webhook_invalid_json | reason=not_an_object")
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    return webhook_data
+
+
+async def process_gateway_payment_event(
+    gateway_order_id: str,
+    gateway_payment_id: str,
+    payment_status: int,
+    background_tasks: BackgroundTasks,
+    log_prefix: str,
+    required_payment_mode: Optional[str] = None,
+) -> None:
+    """
+    Apply one gateway payment event to every order paid through the gateway order.
+
+    Updates the gateway payment rows of all payable orders in one statement, settles their
+    wallet and cash/online records, moves the paid orders to OPEN and queues their Potions
+    WMS sync (grouped by facility) to run after the response.
+    Errors are raised so the webhook responds with 500 and the gateway retries.
+    """
+    service = OrderService()
+    potions_service = PotionsService()
+
+    # Fetch all orders by payment_order_id (gateway order id)
+    orders_to_process = await asyncio.to_thread(payment_repository.get_orders_by_payment_order_id, gateway_order_id)
+
+    if not orders_to_process:
+        logger.warning(f"{log_prefix}: No orders found | gateway_order_id={gateway_order_id}")
+        return
+
+    logger.info(f"{log_prefix}: Processing orders | gateway_order_id={gateway_order_id} orders_count={len(orders_to_process)}")
+
+    # Fetch payment records for all processable orders in one query
+    payments_by_order = await asyncio.to_thread(
+        payment_repository.get_payments_for_orders,
+        [o.get('order_id') for o in orders_to_process if o.get('status') in PaymentGatewayConstants.PROCESSABLE_ORDER_STATUSES],
+    )
+
+    # Orders whose payment records can take this event: order_id -> (facility_name, payment_records)
+    payable_orders = {}
+    for order_data in orders_to_process:
+        payment_records = _payable_payment_records(order_data, payments_by_order, gateway_payment_id, log_prefix, required_payment_mode)
+        if payment_records:
+            payable_orders[order_data.get('order_id')] = (order_data.get('facility_name'), payment_records)
+
+    # Gateway payment rows of all orders are updated in one statement
+    results = await payment_processor.process_gateway_orders_batch(
+        [(order_id, payment_records) for order_id, (_, payment_records) in payable_orders.items()],
+        gateway_payment_id,
+        payment_status,
+    )
+
+    # Orders whose payments succeeded: (order_id, facility_name, sync_order)
+    paid_orders = []
+    for order_id, (facility_name, _) in payable_orders.items():
+        payments_status, sync_order = results.get(order_id, (False, False))
+        if payments_status:
+            paid_orders.append((order_id, facility_name, sync_order))
+        else:
+            logger.warning(f"{log_prefix}: Payment processing failed | order_id={order_id}")
+
+    if not paid_orders:
+        return
+
+    # Move all paid orders to OPEN in a single update
+    order_result = await service.update_order_statuses([order_id for order_id, _, _ in paid_orders], OrderStatus.OPEN)
+    logger.info(f"{log_prefix}: Order status updated | gateway_order_id={gateway_order_id} status={int(OrderStatus.OPEN)} result={order_result}")
+
+    if order_result.get("success"):
+        # Group orders to sync by facility; the sync runs after the response
+        sync_order_ids_by_facility: Dict[str, List[str]] = {}
+        for order_id, facility_name, sync_order in paid_orders:
+            if sync_order:
+                sync_order_ids_by_facility.setdefault(facility_name, []).append(order_id)
+        for facility_name, sync_order_ids in sync_order_ids_by_facility.items():
+            background_tasks.add_task(potions_service.sync_orders_by_ids, facility_name, sync_order_ids, service)
+            logger.info(f"{log_prefix}: WMS sync queued | facility_name={facility_name} order_ids={sync_order_ids}")
+
+
+def _payable_payment_records(order_data: dict, payments_by_order: dict, gateway_payment_id: str, log_prefix: str, required_payment_mode: Optional[str] = None) -> Optional[list]:
+    """
+    Return the payment records of an order that can take a gateway payment event, or None to skip it.
+    """
+    order_id = order_data.get('order_id')
+    order_status = order_data.get('status')
+
+    # Only process orders in DRAFT (0) or OPEN (10) status
+    if order_status not in PaymentGatewayConstants.PROCESSABLE_ORDER_STATUSES:
+        logger.info(f"{log_prefix}: Skipping order | order_id={order_id} status={order_status}")
+        return None
+
+    payment_records = payments_by_order.get(order_id)
+    if not payment_records:
+        logger.warning(f"{log_prefix}: No payment records | order_id={order_id}")
+        return None
+
+    if required_payment_mode and not any((r.get("payment_mode") or "").casefold() == required_payment_mode for r in payment_records):
+        logger.warning(f"{log_prefix}: No {required_payment_mode} payment found | order_id={order_id}")
+        return None
+
+    # Re-delivered event: this gateway payment has already completed the order
+    if any(r.get('payment_id') == str(gateway_payment_id) and r.get('payment_status') == PaymentStatus.COMPLETED for r in payment_records):
+        logger.info(f"{log_prefix}: Payment already processed | order_id={order_id} payment_id={gateway_payment_id}")
+        return None
+
+    return payment_records
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Dict, Tuple
 from sqlalchemy import text
 from app.core.constants import OrderStatus
@@ -166,11 +167,12 @@ class ReturnsValidator:
             raise ValueError(f"Return not allowed: {'; '.join(errors)}")
 
     @staticmethod
-    def validate_order_for_return(order_id: str, route_mode: str) -> None:
+    async def validate_order_for_return(order_id: str, route_mode: str) -> None:
         """Validate order exists and mode matches route origin"""
         
         order_service = OrderQueryService()
-        order = order_service.get_order_by_id(order_id)
+        # Order lookup is a blocking DB read; keep it off the event loop
+        order = await asyncio.to_thread(order_service.get_order_by_id, order_id)
         
         if not order:
             logger.error(f"Order {order_id} not found")
@@ -0,0 +1,34 @@
+"""added order list indexes
+
+Revision ID: 5b7e2c9d41a3
+Revises: d3c38e1d1b57
+Create Date: 2026-10-16 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2c9d41a3'
+down_revision: Union[str, Sequence[str], None] = 'd3c38e1d1b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Customer and facility order lists filter on one column and page by created_at;
+    # built concurrently so orders stay writable while they build
+    with op.get_context().autocommit_block():
+        op.create_index('idx_orders_customer_created', 'orders', ['customer_id', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('idx_orders_facility_name_created', 'orders', ['facility_name', 'created_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_orders_facility_name_created', table_name='orders', postgresql_concurrently=True)
+        op.drop_index('idx_orders_customer_created', table_name='orders', postgresql_concurrently=True)
@@ -0,0 +1,40 @@
+"""added orders trigram search index
+
+Revision ID: 9c41d7e2a6f8
+Revises: 5b7e2c9d41a3
+Create Date: 2026-10-16 11:02:17.304918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41d7e2a6f8'
+down_revision: Union[str, Sequence[str], None] = '5b7e2c9d41a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Serves the LOWER(col) LIKE '%term%' searches of the order list endpoints;
+    # built concurrently so orders stay writable while it builds
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_orders_search_trgm',
+            'orders',
+            [sa.text('lower(order_id) gin_trgm_ops'), sa.text('lower(customer_name) gin_trgm_ops'), sa.text('lower(order_mode) gin_trgm_ops')],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_orders_search_trgm', table_name='orders', postgresql_concurrently=True)